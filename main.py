@@ -1,95 +1,384 @@
 # main.py
 
-from utils.file_handler import read_sales_data
+import hashlib
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+from utils.file_handler import resolve_input_paths, read_sales_shards
 from utils.data_processor import (
-    parse_transactions, validate_and_filter,
-    calculate_total_revenue, region_wise_sales,
-    top_selling_products, customer_analysis,
-    daily_sales_trend, find_peak_sales_day,
-    low_performing_products, generate_sales_report
+    parse_transaction_shards, validate_and_filter,
+    compute_aggregates, generate_sales_report
+)
+from utils.api_handler import (
+    fetch_all_products, create_product_mapping, enrich_sales_data,
+    save_enriched_data_partitioned, MANIFEST_FILE
+)
+from utils.cache_handler import file_fingerprint, inputs_fingerprint, make_key, cache_get, cache_put
+from utils.scheduler import run_stages
+from utils.preview import (
+    DEFAULT_SAMPLE_SIZE, reservoir_sample,
+    filter_sample, unsampled_strata, generate_preview_report
 )
-from utils.api_handler import fetch_all_products, create_product_mapping, enrich_sales_data
 
 
-def main():
-    try:
-        print("=" * 40)
-        print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
+INPUT_FILE = "data/sales_data.txt"  # default input, change with --input=<path or glob>
+ENRICHED_FILE = "data/enriched_sales_data.txt"
+ENRICHED_PARTITIONS_DIR = "data/enriched_sales"
+REPORT_FILE = "output/sales_report.txt"
+PREVIEW_REPORT_FILE = "output/preview_report.txt"
 
-        # 1 Read sales data
-        print("\n[1/10] Reading sales data...")
-        raw_lines = read_sales_data("data/sales_data.txt")
-        print(f"✓ Successfully read {len(raw_lines)} transactions")
+# Fetched catalog is reused for this many seconds before fetching again
+CATALOG_TTL_SECONDS = 60 * 60
 
-        # 2 Parse and clean
-        print("\n[2/10] Parsing and cleaning data...")
-        transactions = parse_transactions(raw_lines)
-        print(f"✓ Parsed {len(transactions)} records")
+# Input files read ahead in background threads while earlier ones are parsed
+READ_WORKERS = 4
+
+
+def run_key(name, input_hash, *parts):
+    # Without an input hash (e.g. a missing file) there is nothing safe
+    # to key results on, so nothing is cached for this run
+    if input_hash is None:
+        return None
+    return make_key(name, input_hash, *parts)
 
-        # 3 Filter options
-        print("\n[3/10] Filter Options Available:")
-        choice = input("Do you want to filter data? (y/n): ").strip().lower()
 
-        region = None
-        min_amount = None
-        max_amount = None
+class SalesData:
+    """
+    The sales rows for one run (input files + filters), loaded the first
+    time a stage needs them. When every stage after it finds its result
+    in the cache, the input files are not read at all.
+    """
 
-        if choice == "y":
-            region = input("Enter region name (or press Enter to skip): ").strip()
-            if region == "":
-                region = None
+    def __init__(self, paths, input_hash, filters):
+        self.paths = paths
+        self.input_hash = input_hash
+        self.filters = filters
+        self.lock = threading.RLock()
+        self._valid = None
+        self._enriched = None
 
-            min_input = input("Enter minimum amount (or press Enter to skip): ").strip()
-            if min_input != "":
-                min_amount = float(min_input)
+    def key(self, name, *parts):
+        # Cache key for a result that depends on the input files and filters
+        return run_key(name, self.input_hash, self.filters, *parts)
 
-            max_input = input("Enter maximum amount (or press Enter to skip): ").strip()
-            if max_input != "":
-                max_amount = float(max_input)
+    def _parsed(self):
+        # 2 + 3 Read, parse and clean (reused when the same files were parsed before)
+        print("\n[2/10] Reading sales data...")
+        key = run_key("parse", self.input_hash)
+        hit, transactions = cache_get(key)
+        if hit:
+            print(f"✓ Input unchanged, loaded {len(transactions)} parsed records from cache")
+            return transactions
 
+        print("\n[3/10] Parsing and cleaning data...")
+        # Each file is parsed while the next ones are still being read and decompressed
+        transactions = parse_transaction_shards(read_sales_shards(self.paths, workers=READ_WORKERS))
+        print(f"✓ Parsed {len(transactions)} records")
+
+        cache_put(key, transactions)
+        return transactions
+
+    def _validate(self):
         # 4 Validate + filter
+        transactions = self._parsed()
         print("\n[4/10] Validating transactions...")
-        valid_transactions, invalid_count, summary = validate_and_filter(
-            transactions, region=region, min_amount=min_amount, max_amount=max_amount
-        )
+
+        # The cache keeps the positions of the valid rows in the parsed
+        # table, not a second copy of the rows
+        key = self.key("validate")
+        hit, positions = cache_get(key)
+        if hit:
+            valid_transactions = [transactions[i] for i in positions]
+            print(f"✓ Loaded {len(valid_transactions)} valid transactions from cache")
+            return valid_transactions
+
+        valid_transactions, invalid_count, summary = validate_and_filter(transactions, **self.filters)
         print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
 
-        # 5 Analysis
+        position = {id(t): i for i, t in enumerate(transactions)}
+        cache_put(key, [position[id(t)] for t in valid_transactions])
+        return valid_transactions
+
+    def valid(self):
+        with self.lock:
+            if self._valid is None:
+                self._valid = self._validate()
+            return self._valid
+
+    def enriched(self, product_mapping):
+        # 8 Save is already done inside enrich_sales_data()
+        with self.lock:
+            if self._enriched is None:
+                self._enriched = enrich_sales_data(self.valid(), product_mapping)
+            return self._enriched
+
+
+def input_stage(source):
+    # Input files to read: a path, a glob pattern or a list of them
+    return resolve_input_paths(source)
+
+
+def fingerprint_stage(paths):
+    # Hash of the input files, used as the base of every cache key
+    input_hash = inputs_fingerprint(paths)
+    if input_hash is None:
+        print("⚠ Input files missing, results will not be cached")
+    return input_hash
+
+
+def filter_prompt_stage():
+    # 1 Filter options
+    print("\n[1/10] Filter Options Available:")
+    choice = input("Do you want to filter data? (y/n): ").strip().lower()
+
+    region = None
+    min_amount = None
+    max_amount = None
+
+    if choice == "y":
+        region = input("Enter region name (or press Enter to skip): ").strip()
+        if region == "":
+            region = None
+
+        min_input = input("Enter minimum amount (or press Enter to skip): ").strip()
+        if min_input != "":
+            min_amount = float(min_input)
+
+        max_input = input("Enter maximum amount (or press Enter to skip): ").strip()
+        if max_input != "":
+            max_amount = float(max_input)
+
+    return {"region": region, "min_amount": min_amount, "max_amount": max_amount}
+
+
+def data_stage(paths, input_hash, filters):
+    # 2 - 4 happen in SalesData, only if a later stage needs the rows
+    return SalesData(paths, input_hash, filters)
+
+
+def analyze_stage(data):
+    # 5 Analysis
+    key = data.key("analyze")
+    hit, aggregates = cache_get(key)
+
+    if hit:
         print("\n[5/10] Analyzing sales data...")
-        calculate_total_revenue(valid_transactions)
-        region_wise_sales(valid_transactions)
-        top_selling_products(valid_transactions)
-        customer_analysis(valid_transactions)
-        daily_sales_trend(valid_transactions)
-        find_peak_sales_day(valid_transactions)
-        low_performing_products(valid_transactions)
-        print("✓ Analysis complete")
-
-        # 6 API fetch
-        print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        product_mapping = create_product_mapping(api_products)
-
-        # 7 Enrich
-        print("\n[7/10] Enriching sales data...")
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+        print("✓ Analysis loaded from cache")
+        return aggregates
+
+    valid_transactions = data.valid()
+    print("\n[5/10] Analyzing sales data...")
+    aggregates = compute_aggregates(valid_transactions)
+    cache_put(key, aggregates)
+    print("✓ Analysis complete")
+    return aggregates
+
+
+def fetch_stage():
+    # 6 API fetch (needs no sales data, so it starts right away)
+    print("\n[6/10] Fetching product data from API...")
+    key = make_key("catalog")
+
+    # Reuse the last successful fetch while it is younger than the TTL
+    hit, cached_catalog = cache_get(key)
+    if hit and time.time() - cached_catalog["fetched_at"] < CATALOG_TTL_SECONDS:
+        product_mapping = cached_catalog["mapping"]
+        print(f"✓ Loaded {len(product_mapping)} products from cache")
+        return product_mapping
+
+    api_products = fetch_all_products()
+    product_mapping = create_product_mapping(api_products)
+
+    # Only cache a successful fetch
+    if product_mapping:
+        cache_put(key, {"fetched_at": time.time(), "mapping": product_mapping})
+    return product_mapping
+
 
+def catalog_version(product_mapping):
+    return hashlib.sha256(repr(sorted(product_mapping.items())).encode("utf-8")).hexdigest()
+
+
+def enrich_stage(data, product_mapping):
+    # 7 + 8 Enrich and save (skipped when the saved file is already up to date)
+    key = data.key("enrich", catalog_version(product_mapping))
+    hit, saved = cache_get(key)
+
+    if hit and file_fingerprint(ENRICHED_FILE) == saved["file_hash"]:
+        print("\n[7/10] Enriching sales data...")
+        print(f"✓ Enriched data unchanged: {ENRICHED_FILE}")
+        enriched_count, total = saved["matched"], saved["total"]
+    else:
+        valid_transactions = data.valid()
+        print("\n[7/10] Enriching sales data...")
+        enriched_transactions = data.enriched(product_mapping)
         enriched_count = sum(1 for t in enriched_transactions if t.get("API_Match"))
-        rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
-        print(f"✓ Enriched {enriched_count}/{len(enriched_transactions)} transactions ({rate:.1f}%)")
+        total = len(enriched_transactions)
+        cache_put(key, {"file_hash": file_fingerprint(ENRICHED_FILE), "matched": enriched_count, "total": total})
+
+    rate = (enriched_count / total) * 100 if total else 0
+    print(f"✓ Enriched {enriched_count}/{total} transactions ({rate:.1f}%)")
+
+
+def partition_stage(data, product_mapping):
+    # 8 Partitioned copy of the enriched data (only with --partitioned)
+    key = data.key("partition", catalog_version(product_mapping))
+    hit, manifest_hash = cache_get(key)
+    manifest_path = os.path.join(ENRICHED_PARTITIONS_DIR, MANIFEST_FILE)
+
+    if hit and file_fingerprint(manifest_path) == manifest_hash:
+        print("\n[8/10] Writing partitioned enriched data...")
+        print(f"✓ Partitioned data unchanged: {ENRICHED_PARTITIONS_DIR}")
+        return
+
+    enriched_transactions = data.enriched(product_mapping)
+    print("\n[8/10] Writing partitioned enriched data...")
+    save_enriched_data_partitioned(enriched_transactions, ENRICHED_PARTITIONS_DIR)
+    cache_put(key, file_fingerprint(manifest_path))
 
-        # 8 Save is already done inside enrich_sales_data()
 
-        # 9 Report
+def report_stage(data, aggregates, product_mapping):
+    # 9 Report (skipped when the same report was already written)
+    key = data.key("report", catalog_version(product_mapping))
+    hit, report_hash = cache_get(key)
+
+    if hit and file_fingerprint(REPORT_FILE) == report_hash:
         print("\n[9/10] Generating report...")
-        generate_sales_report(valid_transactions, enriched_transactions)
+        print(f"✓ Report unchanged: {REPORT_FILE}")
+        return
+
+    valid_transactions = data.valid()
+    enriched_transactions = data.enriched(product_mapping)
+    print("\n[9/10] Generating report...")
+    generate_sales_report(valid_transactions, enriched_transactions, REPORT_FILE, aggregates=aggregates)
+    cache_put(key, file_fingerprint(REPORT_FILE))
+
+
+# Stage dependencies. Independent stages run at the same time:
+# the filter prompt is shown first while the input files are hashed and
+# the API fetch (waiting on the network) runs in the background.
+# Every later stage is cached, keyed by the input files hash, the filters,
+# the catalog version and the code version. Stages check their own key
+# first and only ask SalesData for rows on a miss, so an unchanged rerun
+# does not read or parse anything.
+# The computing stages run one after another ("after" only sets the
+# order, no result is passed), since threads doing pure computation
+# would just take turns.
+# "inputs" gets the input source bound in build_pipeline().
+PIPELINE_STAGES = {
+    "inputs": {"func": input_stage, "deps": [], "kind": "thread"},
+    "fingerprint": {"func": fingerprint_stage, "deps": ["inputs"], "kind": "thread"},
+    "filters": {"func": filter_prompt_stage, "deps": [], "kind": "inline"},
+    "fetch": {"func": fetch_stage, "deps": [], "kind": "thread"},
+    "data": {"func": data_stage, "deps": ["inputs", "fingerprint", "filters"], "kind": "thread"},
+    "analyze": {"func": analyze_stage, "deps": ["data"], "kind": "thread"},
+    "enrich": {"func": enrich_stage, "deps": ["data", "fetch"], "after": ["analyze"], "kind": "thread"},
+    "report": {"func": report_stage, "deps": ["data", "analyze", "fetch"], "after": ["enrich"], "kind": "thread"},
+}
+
+
+# Extra stage added with: python main.py --partitioned
+PARTITION_STAGE = {"func": partition_stage, "deps": ["data", "fetch"], "after": ["enrich"], "kind": "thread"}
+
+
+def build_pipeline(source=INPUT_FILE, partitioned=False) -> dict:
+    """
+    Returns the pipeline stages for the given input source
+    (a path, a glob pattern or a list of paths).
+    """
+    stages = dict(PIPELINE_STAGES)
+    stages["inputs"] = dict(stages["inputs"], func=partial(input_stage, source))
+
+    if partitioned:
+        stages["partition"] = PARTITION_STAGE
+    return stages
+
+
+def preview(source=INPUT_FILE, sample_size=DEFAULT_SAMPLE_SIZE, stratify_by=None):
+    """
+    Quick exploration mode: estimates region sales, top products and the
+    daily trend from a random sample drawn in one pass over the input.
+    """
+    print("\n[PREVIEW] Sampling sales data...")
+    strata = reservoir_sample(source, sample_size=sample_size, stratify_by=stratify_by)
+    sampled = sum(s["sample_size"] for s in strata.values())
+    population = sum(s["population"] for s in strata.values())
+    print(f"✓ Sampled {sampled} of {population} records")
+
+    missing = unsampled_strata(strata)
+    if missing:
+        print(f"⚠ {len(missing)} of {len(strata)} strata have no sampled rows and are left out of the estimates")
+
+    filters = filter_prompt_stage()
+    sample = filter_sample(strata, **filters)
+
+    print("\n[PREVIEW] Estimating figures from sample...")
+    generate_preview_report(sample, stratify_by=stratify_by, output_file=PREVIEW_REPORT_FILE)
+
+    print("=" * 40)
+    print("⚠ Preview figures are ESTIMATES, not exact totals.")
+    print(f"- {PREVIEW_REPORT_FILE}")
+    print("=" * 40)
+
+
+def parse_preview_args(args):
+    """
+    Reads preview options from the command line:
+    python main.py --preview [--sample-size=5000] [--stratify=Region|Date]
+    """
+    sample_size = DEFAULT_SAMPLE_SIZE
+    stratify_by = None
+
+    for arg in args:
+        if arg.startswith("--sample-size="):
+            sample_size = int(arg.split("=", 1)[1])
+            if sample_size < 1:
+                raise ValueError("--sample-size must be at least 1")
+        elif arg.startswith("--stratify="):
+            stratify_by = arg.split("=", 1)[1]
+            if stratify_by not in ("Region", "Date"):
+                raise ValueError("--stratify must be Region or Date")
+
+    return sample_size, stratify_by
+
+
+def parse_input_arg(args):
+    """
+    Reads the input source from the command line:
+    python main.py --input="data/shards/sales_*.txt.gz"
+    Defaults to data/sales_data.txt.
+    """
+    for arg in args:
+        if arg.startswith("--input="):
+            return arg.split("=", 1)[1]
+    return INPUT_FILE
+
+
+def main():
+    try:
+        print("=" * 40)
+        print("SALES ANALYTICS SYSTEM")
+        print("=" * 40)
+
+        source = parse_input_arg(sys.argv[1:])
+
+        if "--preview" in sys.argv[1:]:
+            sample_size, stratify_by = parse_preview_args(sys.argv[1:])
+            preview(source, sample_size, stratify_by)
+            return
+
+        run_stages(build_pipeline(source, partitioned="--partitioned" in sys.argv[1:]))
 
         # 10 Done
         print("\n[10/10] Process Complete!")
         print("=" * 40)
         print("✅ Output Files Created:")
         print("- data/enriched_sales_data.txt")
+        if "--partitioned" in sys.argv[1:]:
+            print(f"- {ENRICHED_PARTITIONS_DIR}/")
         print("- output/sales_report.txt")
         print("=" * 40)
 
@@ -0,0 +1,111 @@
+# tests/test_cache_handler.py
+
+import os
+import time
+
+import pytest
+
+from utils import cache_handler
+from utils.cache_handler import (
+    cache_get, cache_put, cached, code_version, evict_cache, file_fingerprint, inputs_fingerprint, make_key
+)
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache_dir = str(tmp_path)
+    assert cache_get("missing", cache_dir) == (False, None)
+
+    cache_put("k", {"rows": [1, 2, 3]}, cache_dir)
+    assert cache_get("k", cache_dir) == (True, {"rows": [1, 2, 3]})
+
+
+def test_cached_computes_once(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 42
+
+    assert cached("k", compute, str(tmp_path)) == (42, False)
+    assert cached("k", compute, str(tmp_path)) == (42, True)
+    assert len(calls) == 1
+
+
+def test_lru_eviction_removes_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    for key in ("a", "b", "c"):
+        cache_put(key, "x" * 1000, cache_dir)
+
+    # Make the access order explicit: a is oldest, then b, then c
+    now = time.time()
+    for age, key in ((30, "a"), (20, "b"), (10, "c")):
+        path = os.path.join(cache_dir, key + ".pkl")
+        os.utime(path, (now - age, now - age))
+
+    # Reading a marks it as recently used, so b is now the oldest
+    assert cache_get("a", cache_dir)[0]
+
+    entry_size = os.path.getsize(os.path.join(cache_dir, "a.pkl"))
+    evict_cache(cache_dir, max_bytes=2 * entry_size)
+
+    assert cache_get("b", cache_dir) == (False, None)
+    assert cache_get("a", cache_dir)[0]
+    assert cache_get("c", cache_dir)[0]
+
+
+def test_make_key_ignores_dict_order_but_not_values():
+    assert make_key("v", {"region": "East", "min_amount": None}) == make_key("v", {"min_amount": None, "region": "East"})
+    assert make_key("v", {"region": "East"}) != make_key("v", {"region": "West"})
+    assert make_key("parse", "abc") != make_key("validate", "abc")
+
+
+def test_code_version_does_not_depend_on_working_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_handler, "_code_version", None)
+    from_root = code_version()
+
+    monkeypatch.setattr(cache_handler, "_code_version", None)
+    monkeypatch.chdir(tmp_path)
+    assert code_version() == from_root
+
+
+def test_code_version_fails_when_no_source_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_handler, "_code_version", None)
+    monkeypatch.setattr(cache_handler, "PROJECT_ROOT", str(tmp_path))
+
+    with pytest.raises(RuntimeError, match="No source files"):
+        code_version()
+
+
+def test_file_fingerprint(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("a|b\n")
+    assert file_fingerprint(str(path)) == file_fingerprint(str(path))
+    assert file_fingerprint(str(tmp_path / "missing.txt")) is None
+
+
+def test_inputs_fingerprint_covers_every_file_and_their_order(tmp_path):
+    first = tmp_path / "a.txt"
+    second = tmp_path / "b.txt"
+    first.write_text("a|b\n")
+    second.write_text("c|d\n")
+    paths = [str(first), str(second)]
+
+    original = inputs_fingerprint(paths)
+    assert original == inputs_fingerprint(list(paths))
+    assert original != inputs_fingerprint(paths[::-1])
+
+    second.write_text("c|e\n")
+    assert inputs_fingerprint(paths) != original
+
+
+def test_inputs_fingerprint_is_none_without_files(tmp_path):
+    assert inputs_fingerprint([]) is None
+    assert inputs_fingerprint([str(tmp_path / "missing.txt")]) is None
+
+
+def test_none_key_is_never_cached(tmp_path):
+    cache_dir = str(tmp_path)
+    cache_put(None, "value", cache_dir)
+
+    assert cache_get(None, cache_dir) == (False, None)
+    assert os.listdir(cache_dir) == []
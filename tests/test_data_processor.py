@@ -0,0 +1,109 @@
+# tests/test_data_processor.py
+
+import random
+
+import pytest
+
+from utils.file_handler import read_sales_data
+from utils.data_processor import (
+    to_paise, parse_transactions, validate_and_filter, compute_aggregates, generate_sales_report
+)
+
+
+@pytest.mark.parametrize("value, paise", [
+    ("1916.5", 191650),
+    ("1916.50", 191650),
+    ("250", 25000),
+    (".5", 50),
+    ("12.344", 1234),
+    ("12.345", 1235),     # half a paisa rounds up
+    ("0.005", 1),
+    ("-0.005", -1),       # ... and away from zero for negatives
+    ("-12.345", -1235),
+    ("-20", -2000),
+    ("+3.999", 400),
+    ("1,916.5", 191650),
+    (" 18,000.00 ", 1800000),
+    ("1e3", 100000),      # exponent form goes through the Decimal fallback
+    (1916.5, 191650),
+    (7, 700),
+])
+def test_to_paise(value, paise):
+    assert to_paise(value) == paise
+
+
+@pytest.mark.parametrize("value", ["nan", "inf", "-inf", "abc", "", "-", ".", "1.2.3", "--5"])
+def test_to_paise_rejects_non_amounts(value):
+    with pytest.raises(ValueError):
+        to_paise(value)
+
+
+def test_rows_with_non_finite_prices_are_skipped():
+    lines = [
+        "T001|2024-12-01|P101|Mouse|1|nan|C001|East",
+        "T002|2024-12-01|P101|Mouse|1|inf|C001|East",
+        "T003|2024-12-01|P101|Mouse|1|0.10|C001|East",
+    ]
+    assert [t["TransactionID"] for t in parse_transactions(lines)] == ["T003"]
+
+
+def test_non_finite_filter_amounts_do_not_abort_validation():
+    transactions = parse_transactions(["T001|2024-12-01|P101|Mouse|2|0.10|C001|East"])
+
+    valid, _, _ = validate_and_filter(transactions, min_amount=float("-inf"), max_amount=float("inf"))
+    assert len(valid) == 1
+
+    valid, _, _ = validate_and_filter(transactions, min_amount=float("nan"))
+    assert valid == []
+
+
+def test_sums_do_not_depend_on_row_order():
+    # Prices whose float sums change with the order they are added in
+    lines = [f"T{i:03d}|2024-12-01|P101|Mouse|1|{price}|C001|East"
+             for i, price in enumerate(["0.10", "0.20", "0.30", "1e16", "-1e16", "3.33"] * 50)]
+    transactions = parse_transactions(lines)
+    expected = compute_aggregates(transactions)
+
+    rng = random.Random(7)
+    for _ in range(5):
+        shuffled = transactions[:]
+        rng.shuffle(shuffled)
+        aggregates = compute_aggregates(shuffled)
+
+        assert aggregates["total_revenue"] == expected["total_revenue"] == 19650
+        assert aggregates["region_sales"] == expected["region_sales"]
+
+
+def test_report_format_is_unchanged(tmp_path):
+    valid, _, _ = validate_and_filter(parse_transactions(read_sales_data("data/sales_data.txt")))
+    output_file = tmp_path / "report.txt"
+    generate_sales_report(valid, [], str(output_file))
+
+    report = output_file.read_text(encoding="utf-8")
+
+    assert """OVERALL SUMMARY
+--------------------------------------------
+Total Revenue:        ₹3,527,808.00
+Total Transactions:   70
+Average Order Value:  ₹50,397.26
+Date Range:           2024-12-01 to 2024-12-30
+
+REGION-WISE PERFORMANCE
+--------------------------------------------
+Region    Sales           % of Total  Transactions
+North     ₹1,321,605        37.46%      21
+South     ₹889,332        25.21%      13
+West      ₹848,902        24.06%      19
+East      ₹467,969        13.27%      17
+
+TOP 5 PRODUCTS
+--------------------------------------------
+Rank  Product Name        Qty Sold  Revenue   
+1     Mouse               61        ₹40,297
+2     Wireless Mouse      45        ₹49,981
+3     Webcam              35        ₹128,187
+4     USB Cable           33        ₹7,622
+5     Monitor             30        ₹493,759
+""" in report
+    assert "Best Selling Day: 2024-12-02 (₹882,906, 5 transactions)" in report
+    assert "- Laptop: 3 units, ₹184,329" in report
@@ -0,0 +1,138 @@
+# tests/test_file_handler.py
+
+import bz2
+import gzip
+import lzma
+import threading
+import time
+
+import pytest
+
+import utils.file_handler as file_handler
+from utils.file_handler import (
+    detect_compression, fallback_encoding, iter_raw_sales_lines,
+    read_sales_data, read_sales_file, read_sales_shards, resolve_input_paths
+)
+
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def rows(start, count):
+    return [f"T{i:03d}|2024-12-01|P101|Mouse|1|500|C001|East" for i in range(start, start + count)]
+
+
+def write_shard(path, lines, opener=open):
+    text = HEADER + "\n".join(lines) + "\n"
+    with opener(path, "wb") as file:
+        file.write(text.encode("utf-8"))
+    return str(path)
+
+
+@pytest.mark.parametrize("opener, name", [(gzip.open, "gzip"), (bz2.open, "bz2"), (lzma.open, "xz")])
+def test_compressed_files_are_detected_and_read(tmp_path, opener, name):
+    path = write_shard(tmp_path / "sales.bin", rows(1, 3), opener)
+
+    assert detect_compression(path) == name
+    assert read_sales_file(path) == rows(1, 3)
+
+
+def test_plain_file_is_not_detected_as_compressed(tmp_path):
+    path = write_shard(tmp_path / "sales.txt", rows(1, 2))
+
+    assert detect_compression(path) is None
+    assert read_sales_file(path) == rows(1, 2)
+
+
+def test_zstd_file_with_several_frames_is_read_completely(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    first = (HEADER + "\n".join(rows(1, 2)) + "\n").encode("utf-8")
+    second = ("\n".join(rows(3, 2)) + "\n").encode("utf-8")
+
+    compressor = zstandard.ZstdCompressor()
+    path = tmp_path / "sales.txt.zst"
+    path.write_bytes(compressor.compress(first) + compressor.compress(second))
+
+    assert detect_compression(str(path)) == "zstd"
+    assert read_sales_file(str(path)) == rows(1, 4)
+
+
+def test_header_row_is_skipped_in_every_file(tmp_path):
+    first = write_shard(tmp_path / "a.txt", rows(1, 2))
+    second = write_shard(tmp_path / "b.txt.gz", rows(3, 2), gzip.open)
+
+    assert read_sales_data([first, second]) == rows(1, 4)
+
+
+def test_glob_and_list_sources_are_resolved_in_order(tmp_path):
+    for name in ["sales_2.txt", "sales_1.txt", "other.txt"]:
+        write_shard(tmp_path / name, [])
+
+    pattern = str(tmp_path / "sales_*.txt")
+    assert resolve_input_paths(pattern) == [str(tmp_path / "sales_1.txt"), str(tmp_path / "sales_2.txt")]
+    assert resolve_input_paths([str(tmp_path / "other.txt"), pattern]) == [
+        str(tmp_path / "other.txt"), str(tmp_path / "sales_1.txt"), str(tmp_path / "sales_2.txt")
+    ]
+    assert resolve_input_paths("data/sales_data.txt") == ["data/sales_data.txt"]
+
+
+def test_no_matching_files_returns_empty_list(tmp_path, capsys):
+    assert read_sales_data(str(tmp_path / "missing_*.txt")) == []
+    assert "No files matched" in capsys.readouterr().out
+
+
+def test_shards_are_read_ahead_boundedly_and_yielded_in_order(tmp_path, monkeypatch):
+    paths = [write_shard(tmp_path / f"sales_{i}.txt", rows(i * 10, 2)) for i in range(8)]
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    real_read = file_handler.read_sales_file
+
+    def slow_read(path):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        # Later shards finish first, so order must come from the reader
+        time.sleep(0.02 * (8 - paths.index(path)) / 8)
+        with lock:
+            active -= 1
+        return real_read(path)
+
+    monkeypatch.setattr(file_handler, "read_sales_file", slow_read)
+
+    shards = list(read_sales_shards(paths, workers=3))
+
+    assert shards == [rows(i * 10, 2) for i in range(8)]
+    assert peak <= 3
+
+
+def test_corrupt_archive_is_reported_and_skipped(tmp_path, capsys):
+    path = tmp_path / "broken.txt.gz"
+    data = gzip.compress((HEADER + "\n".join(rows(1, 50))).encode("utf-8"))
+    path.write_bytes(data[:len(data) // 2])
+
+    assert read_sales_file(str(path)) == []
+    assert "Could not decompress file" in capsys.readouterr().out
+
+
+def test_latin1_file_is_read_with_fallback_encoding(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_bytes((HEADER + "T001|2024-12-01|P101|Café Mug|1|500|C001|East\n").encode("latin-1"))
+
+    assert read_sales_file(str(path)) == ["T001|2024-12-01|P101|Café Mug|1|500|C001|East"]
+
+
+def test_raw_lines_skip_header_and_empty_lines(tmp_path):
+    path = write_shard(tmp_path / "sales.txt.gz", rows(1, 2) + ["", "  "] + rows(3, 1), gzip.open)
+
+    assert list(iter_raw_sales_lines(path)) == [line.encode("utf-8") for line in rows(1, 3)]
+
+
+def test_fallback_encoding_matches_read_sales_file():
+    assert fallback_encoding(b"T001|Mouse") == "utf-8"
+    assert fallback_encoding("Café".encode("utf-8")) == "utf-8"
+    assert fallback_encoding("Café".encode("latin-1")) == "latin-1"
+    # Once a file needs latin-1, it stays latin-1
+    assert fallback_encoding(b"T001|Mouse", "latin-1") == "latin-1"
@@ -0,0 +1,117 @@
+# tests/test_partitions.py
+
+import json
+import os
+
+from utils.api_handler import read_enriched_partitions, save_enriched_data_partitioned, MANIFEST_FILE
+
+
+def make_row(i, date, region, qty, price_paise):
+    return {
+        "TransactionID": f"T{i:03d}", "Date": date, "ProductID": "P101", "ProductName": "Mouse",
+        "Quantity": qty, "UnitPrice": price_paise, "CustomerID": "C001", "Region": region,
+        "API_Category": "accessories", "API_Brand": None, "API_Rating": 4.5, "API_Match": True
+    }
+
+
+ROWS = [
+    make_row(1, "2024-12-01", "East", 1, 10000),     # ₹100
+    make_row(2, "2024-12-01", "East", 2, 50000),     # ₹1,000
+    make_row(3, "2024-12-01", "West", 5, 200000),    # ₹10,000
+    make_row(4, "2024-12-02", "East", 1, 30000),     # ₹300
+    make_row(5, "2024-12-03", "North", 10, 100000),  # ₹10,000
+]
+
+
+def load_manifest(base_dir):
+    with open(os.path.join(base_dir, MANIFEST_FILE), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def ids(rows):
+    return sorted(t["TransactionID"] for t in rows)
+
+
+def test_manifest_records_row_counts_and_stats(tmp_path):
+    base_dir = str(tmp_path)
+    save_enriched_data_partitioned(ROWS, base_dir)
+
+    manifest = load_manifest(base_dir)
+    assert manifest["total_rows"] == 5
+
+    east = [p for p in manifest["partitions"] if p["date"] == "2024-12-01" and p["region"] == "East"][0]
+    assert east["path"].startswith("date=2024-12-01/region=East/")
+    assert east["row_count"] == 2
+    assert (east["min_amount_paise"], east["max_amount_paise"]) == (10000, 100000)
+
+
+def test_round_trip_keeps_values(tmp_path):
+    save_enriched_data_partitioned(ROWS, str(tmp_path))
+    rows = read_enriched_partitions(str(tmp_path))
+
+    assert ids(rows) == ids(ROWS)
+    first = [t for t in rows if t["TransactionID"] == "T001"][0]
+    assert first["UnitPrice"] == 10000
+    assert first["API_Rating"] == 4.5
+    assert first["API_Brand"] is None
+    assert first["API_Match"] is True
+
+
+def test_reader_prunes_partitions_by_filters(tmp_path, capsys):
+    save_enriched_data_partitioned(ROWS, str(tmp_path))
+    capsys.readouterr()
+
+    assert ids(read_enriched_partitions(str(tmp_path), region="east")) == ["T001", "T002", "T004"]
+    assert "Reading 2/4 partitions" in capsys.readouterr().out
+
+    rows = read_enriched_partitions(str(tmp_path), min_amount=5000)
+    assert ids(rows) == ["T003", "T005"]
+    assert "Reading 2/4 partitions" in capsys.readouterr().out
+
+    rows = read_enriched_partitions(str(tmp_path), start_date="2024-12-02", end_date="2024-12-02")
+    assert ids(rows) == ["T004"]
+    assert "Reading 1/4 partitions" in capsys.readouterr().out
+
+    # Row-level filter inside a partition that cannot be pruned
+    assert ids(read_enriched_partitions(str(tmp_path), region="East", max_amount=500)) == ["T001", "T004"]
+
+
+def test_similar_region_names_do_not_collide(tmp_path):
+    rows = [make_row(1, "2024-12-01", "East/1", 1, 100), make_row(2, "2024-12-01", "East_1", 1, 100)]
+    save_enriched_data_partitioned(rows, str(tmp_path))
+
+    paths = [p["path"] for p in load_manifest(str(tmp_path))["partitions"]]
+    assert len(set(os.path.dirname(p) for p in paths)) == 2
+    assert ids(read_enriched_partitions(str(tmp_path))) == ["T001", "T002"]
+
+
+def test_rewrite_removes_stale_partitions(tmp_path):
+    base_dir = str(tmp_path)
+    save_enriched_data_partitioned(ROWS, base_dir)
+    old_manifest = load_manifest(base_dir)
+
+    save_enriched_data_partitioned(ROWS[:1], base_dir)
+
+    assert ids(read_enriched_partitions(base_dir)) == ["T001"]
+    assert not os.path.exists(os.path.join(base_dir, "date=2024-12-03"))
+    for p in old_manifest["partitions"]:
+        assert not os.path.exists(os.path.join(base_dir, p["path"]))
+
+
+def test_rewrite_keeps_old_files_until_manifest_is_replaced(tmp_path, monkeypatch):
+    base_dir = str(tmp_path)
+    save_enriched_data_partitioned(ROWS, base_dir)
+    old_paths = [os.path.join(base_dir, p["path"]) for p in load_manifest(base_dir)["partitions"]]
+
+    seen_before_swap = []
+    real_replace = os.replace
+
+    def checking_replace(src, dst):
+        if dst.endswith(MANIFEST_FILE):
+            seen_before_swap.append(all(os.path.exists(p) for p in old_paths))
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(os, "replace", checking_replace)
+    save_enriched_data_partitioned([make_row(9, "2024-12-09", "South", 1, 100)], base_dir)
+
+    assert seen_before_swap == [True]
@@ -0,0 +1,75 @@
+# tests/test_pipeline.py
+
+import os
+import shutil
+
+import pytest
+
+import main
+
+
+SALES_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "sales_data.txt")
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Outputs and the cache use relative paths, so run in an empty folder
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    os.makedirs("output")
+    shutil.copy(SALES_FILE, "data/sales.txt")
+
+    monkeypatch.setattr("builtins.input", lambda prompt="": "n")
+    monkeypatch.setattr(main, "fetch_all_products", lambda: [])
+
+    reads = []
+    real_read = main.read_sales_shards
+
+    def counting_read(source, workers=1):
+        reads.append(source)
+        return real_read(source, workers)
+
+    monkeypatch.setattr(main, "read_sales_shards", counting_read)
+    return reads
+
+
+def test_unchanged_rerun_does_not_read_the_input(workdir):
+    reads = workdir
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    with open(main.REPORT_FILE, encoding="utf-8") as file:
+        report = file.read()
+    assert len(reads) == 1
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    assert len(reads) == 1
+    with open(main.REPORT_FILE, encoding="utf-8") as file:
+        assert file.read() == report
+
+
+def test_deleted_report_is_rebuilt_from_cached_rows(workdir):
+    reads = workdir
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    os.remove(main.REPORT_FILE)
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    assert len(reads) == 1
+    assert os.path.exists(main.REPORT_FILE)
+
+
+def test_changed_input_is_read_again(workdir):
+    reads = workdir
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    with open("data/sales.txt", "a", encoding="utf-8") as file:
+        file.write("T999|2024-12-31|P101|Mouse|1|500|C001|East\n")
+
+    main.run_stages(main.build_pipeline("data/sales.txt"))
+    assert len(reads) == 2
+
+
+def test_missing_input_is_not_cached(workdir):
+    main.run_stages(main.build_pipeline("data/missing_*.txt"))
+
+    assert not os.path.exists(".cache/results") or os.listdir(".cache/results") == []
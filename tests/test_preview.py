@@ -0,0 +1,135 @@
+# tests/test_preview.py
+
+import random
+import statistics
+
+import pytest
+
+import utils.preview as preview
+from utils.file_handler import read_sales_file
+from utils.data_processor import parse_transactions
+from utils.preview import (
+    estimate_group_totals, estimate_total, filter_sample,
+    reservoir_sample, unsampled_strata, Z_95
+)
+
+
+def make_row(i, region, date, qty, price_paise):
+    return {
+        "TransactionID": f"T{i:03d}", "Date": date, "ProductID": "P101",
+        "ProductName": "Mouse", "Quantity": qty, "UnitPrice": price_paise,
+        "CustomerID": "C001", "Region": region
+    }
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    regions = ["North"] * 60 + ["South"] * 30 + ["East"] * 10
+    lines = ["TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"]
+    for i, region in enumerate(regions, start=1):
+        day = 1 + i % 5
+        lines.append(f"T{i:03d}|2024-12-0{day}|P101|Mouse|{1 + i % 3}|{100 + i}|C{i:03d}|{region}")
+
+    path = tmp_path / "sales.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_stratified_sample_keeps_total_budget(sales_file):
+    strata = reservoir_sample(sales_file, sample_size=20, stratify_by="Region", seed=1)
+
+    assert sum(s["sample_size"] for s in strata.values()) == 20
+    assert sum(len(s["sample"]) for s in strata.values()) == 20
+    assert {key: s["population"] for key, s in strata.items()} == {"North": 60, "South": 30, "East": 10}
+    for key, stratum in strata.items():
+        assert all(t["Region"] == key for t in stratum["sample"])
+
+
+def test_more_strata_than_sample_rows_is_allowed(sales_file):
+    strata = reservoir_sample(sales_file, sample_size=3, stratify_by="Date", seed=2)
+
+    assert len(strata) == 5
+    assert sum(s["sample_size"] for s in strata.values()) == 3
+    assert sum(s["population"] for s in strata.values()) == 100
+    assert len(unsampled_strata(strata)) >= 2
+
+
+def test_input_is_read_once_and_only_sampled_rows_are_parsed(sales_file, monkeypatch):
+    opened = []
+    parsed = []
+    real_iter = preview.iter_raw_sales_lines
+
+    def counting_iter(path):
+        opened.append(path)
+        return real_iter(path)
+
+    def counting_parse(lines):
+        parsed.extend(lines)
+        return parse_transactions(lines)
+
+    monkeypatch.setattr(preview, "iter_raw_sales_lines", counting_iter)
+    monkeypatch.setattr(preview, "parse_transactions", counting_parse)
+
+    reservoir_sample(sales_file, sample_size=10, stratify_by="Region", seed=3)
+
+    assert opened == [sales_file]
+    assert len(parsed) == 10
+
+
+def test_sample_matches_full_read_for_latin1_files(tmp_path):
+    path = tmp_path / "sales.txt"
+    lines = ["TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region",
+             "T001|2024-12-01|P101|Café Mug|1|500|C001|East",
+             "T002|2024-12-01|P102|Mouse|2|100|C002|Nörth",
+             "T003|2024-12-01|P103|broken row|C003"]
+    path.write_bytes(("\n".join(lines) + "\n").encode("latin-1"))
+
+    strata = reservoir_sample(str(path), sample_size=10, stratify_by="Region")
+    sampled = sorted((t for s in strata.values() for t in s["sample"]), key=lambda t: t["TransactionID"])
+
+    assert sampled == parse_transactions(read_sales_file(str(path)))
+    assert {key: s["population"] for key, s in strata.items()} == {"East": 1, "Nörth": 1}
+
+
+def test_sample_size_below_one_is_rejected(sales_file):
+    with pytest.raises(ValueError):
+        reservoir_sample(sales_file, sample_size=0)
+
+
+def test_full_sample_gives_exact_totals_with_zero_ci(sales_file):
+    strata = filter_sample(reservoir_sample(sales_file, sample_size=1000))
+
+    rows = strata["ALL"]["sample"]
+    exact = sum(t["Quantity"] * t["UnitPrice"] for t in rows)
+
+    assert len(rows) == 100
+    assert estimate_total(strata, lambda t: t["Quantity"] * t["UnitPrice"]) == (exact, 0.0)
+
+    by_region = estimate_group_totals(strata, lambda t: t["Region"], lambda t: 1)
+    assert by_region == {"North": (60, 0.0), "South": (30, 0.0), "East": (10, 0.0)}
+
+
+def test_group_estimate_matches_zero_filled_formula():
+    rng = random.Random(7)
+    sample = [make_row(i, rng.choice(["North", "South"]), "2024-12-01", 1, rng.randint(1, 500)) for i in range(40)]
+    strata = {"ALL": {"population": 400, "sample_size": 40, "sample": sample}}
+
+    est, ci = estimate_group_totals(strata, lambda t: t["Region"], lambda t: t["UnitPrice"])["North"]
+
+    values = [t["UnitPrice"] if t["Region"] == "North" else 0 for t in sample]
+    expected_ci = Z_95 * (400 ** 2 * (1 - 40 / 400) * statistics.variance(values) / 40) ** 0.5
+    assert est == pytest.approx(400 * statistics.mean(values))
+    assert ci == pytest.approx(expected_ci)
+
+
+def test_variance_is_stable_for_large_values():
+    # Large, nearly equal amounts: the one-pass formula loses all precision here
+    base = 10 ** 15
+    sample = [make_row(i, "North", "2024-12-01", 1, base + i) for i in range(10)]
+    strata = {"ALL": {"population": 100, "sample_size": 10, "sample": sample}}
+
+    _, ci = estimate_total(strata, lambda t: t["UnitPrice"])
+
+    values = [t["UnitPrice"] for t in sample]
+    expected_ci = Z_95 * (100 ** 2 * (1 - 10 / 100) * statistics.variance(values) / 10) ** 0.5
+    assert ci == pytest.approx(expected_ci, rel=1e-3)
@@ -0,0 +1,125 @@
+# tests/test_scheduler.py
+
+import sys
+import threading
+import time
+
+import pytest
+
+from utils.scheduler import run_stages
+
+
+def test_results_of_deps_are_passed_in_order():
+    stages = {
+        "a": {"func": lambda: 2, "deps": [], "kind": "thread"},
+        "b": {"func": lambda: 3, "deps": [], "kind": "thread"},
+        "c": {"func": lambda a, b: (a, b), "deps": ["a", "b"], "kind": "thread"},
+        "d": {"func": lambda c: c[0] - c[1], "deps": ["c"], "kind": "inline"},
+    }
+    results = run_stages(stages)
+    assert results == {"a": 2, "b": 3, "c": (2, 3), "d": -1}
+
+
+def test_after_orders_stages_without_passing_results():
+    finished = []
+
+    def slow():
+        time.sleep(0.05)
+        finished.append("slow")
+        return "ignored"
+
+    def then():
+        finished.append("then")
+        return len(finished)
+
+    stages = {
+        "slow": {"func": slow, "deps": [], "kind": "thread"},
+        "then": {"func": then, "deps": [], "after": ["slow"], "kind": "inline"},
+    }
+    assert run_stages(stages)["then"] == 2
+    assert finished == ["slow", "then"]
+
+
+def test_independent_stages_run_at_the_same_time():
+    both_started = threading.Barrier(2, timeout=5)
+
+    def wait_for_other():
+        both_started.wait()
+        return True
+
+    stages = {
+        "a": {"func": wait_for_other, "deps": [], "kind": "thread"},
+        "b": {"func": wait_for_other, "deps": [], "kind": "thread"},
+    }
+    assert run_stages(stages) == {"a": True, "b": True}
+
+
+def test_dependency_cycle_is_rejected():
+    stages = {
+        "a": {"func": lambda b: b, "deps": ["b"]},
+        "b": {"func": lambda a: a, "deps": ["a"]},
+    }
+    with pytest.raises(ValueError, match="cycle"):
+        run_stages(stages)
+
+
+def test_unknown_dependency_and_kind_are_rejected():
+    with pytest.raises(ValueError, match="unknown stage"):
+        run_stages({"a": {"func": lambda x: x, "deps": ["missing"]}})
+    with pytest.raises(ValueError, match="unknown stage"):
+        run_stages({"a": {"func": lambda: 1, "deps": [], "after": ["missing"]}})
+    with pytest.raises(ValueError, match="unknown kind"):
+        run_stages({"a": {"func": lambda: 1, "deps": [], "kind": "gpu"}})
+
+
+def test_stage_exception_is_raised():
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_stages({"a": {"func": fail, "deps": [], "kind": "thread"}})
+
+
+def test_background_output_is_held_while_inline_stage_runs(capsys):
+    inline_started = threading.Event()
+
+    def background():
+        inline_started.wait(timeout=5)
+        print("background message")
+        time.sleep(0.05)
+
+    def prompt():
+        inline_started.set()
+        time.sleep(0.2)
+        sys.stdout.write("prompt line\n")
+
+    stages = {
+        "bg": {"func": background, "deps": [], "kind": "thread"},
+        "prompt": {"func": prompt, "deps": [], "kind": "inline"},
+    }
+    run_stages(stages)
+
+    out = capsys.readouterr().out
+    assert out.index("prompt line") < out.index("background message")
+
+
+def test_lines_from_different_threads_do_not_run_together(capsys):
+    start = threading.Barrier(2, timeout=5)
+
+    def talk(word):
+        start.wait()
+        for _ in range(20):
+            # print() also writes the text and the newline separately
+            sys.stdout.write(f"{word} ")
+            time.sleep(0.001)
+            sys.stdout.write("done\n")
+
+    stages = {
+        "a": {"func": lambda: talk("alpha"), "deps": [], "kind": "thread"},
+        "b": {"func": lambda: talk("beta"), "deps": [], "kind": "thread"},
+    }
+    run_stages(stages)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(set(lines)) == ["alpha done", "beta done"]
+    assert len(lines) == 40
@@ -1,5 +1,23 @@
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
 import requests
 
+from utils.data_processor import paise_to_rupees, to_paise
+
+
+ENRICHED_HEADER = [
+    "TransactionID", "Date", "ProductID", "ProductName", "Quantity", "UnitPrice",
+    "CustomerID", "Region", "API_Category", "API_Brand", "API_Rating", "API_Match"
+]
+
+MANIFEST_FILE = "_manifest.json"
+DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
 
 def fetch_all_products():
     """
@@ -55,38 +73,271 @@ def create_product_mapping(api_products: list[dict]) -> dict:
     return mapping
 
 
-def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
+def _enriched_row(t) -> list[str]:
     """
-    Saves enriched transactions back to a file in pipe-delimited format.
+    Formats one enriched transaction as a list of pipe-file fields.
     """
-    header = [
-        "TransactionID", "Date", "ProductID", "ProductName", "Quantity", "UnitPrice",
-        "CustomerID", "Region", "API_Category", "API_Brand", "API_Rating", "API_Match"
+    return [
+        str(t.get("TransactionID", "")),
+        str(t.get("Date", "")),
+        str(t.get("ProductID", "")),
+        str(t.get("ProductName", "")),
+        str(t.get("Quantity", "")),
+        str(paise_to_rupees(t["UnitPrice"])) if t.get("UnitPrice") is not None else "",
+        str(t.get("CustomerID", "")),
+        str(t.get("Region", "")),
+        str(t.get("API_Category", "")) if t.get("API_Category") is not None else "",
+        str(t.get("API_Brand", "")) if t.get("API_Brand") is not None else "",
+        str(t.get("API_Rating", "")) if t.get("API_Rating") is not None else "",
+        str(t.get("API_Match", False))
     ]
 
+
+def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
+    """
+    Saves enriched transactions back to a file in pipe-delimited format.
+    """
     with open(filename, "w", encoding="utf-8") as file:
-        file.write("|".join(header) + "\n")
+        file.write("|".join(ENRICHED_HEADER) + "\n")
 
         for t in enriched_transactions:
-            row = [
-                str(t.get("TransactionID", "")),
-                str(t.get("Date", "")),
-                str(t.get("ProductID", "")),
-                str(t.get("ProductName", "")),
-                str(t.get("Quantity", "")),
-                str(t.get("UnitPrice", "")),
-                str(t.get("CustomerID", "")),
-                str(t.get("Region", "")),
-                str(t.get("API_Category", "")) if t.get("API_Category") is not None else "",
-                str(t.get("API_Brand", "")) if t.get("API_Brand") is not None else "",
-                str(t.get("API_Rating", "")) if t.get("API_Rating") is not None else "",
-                str(t.get("API_Match", False))
-            ]
-            file.write("|".join(row) + "\n")
+            file.write("|".join(_enriched_row(t)) + "\n")
 
     print(f"✅ Enriched data saved to: {filename}")
 
 
+# ============================================================
+# PARTITIONED ENRICHED OUTPUT
+# ============================================================
+
+def _partition_key(value) -> str:
+    """
+    Normalizes a Date/Region value used to group rows into partitions.
+    """
+    return str(value).strip() if value is not None else ""
+
+
+def _partition_value(value: str) -> str:
+    """
+    Turns a normalized partition key into a directory-name value.
+    Special characters are percent-encoded (as Hive does), so two
+    different values can never map to the same directory.
+    """
+    if value == "":
+        return DEFAULT_PARTITION
+    if value in (".", ".."):
+        return value.replace(".", "%2E")
+    return quote(value, safe=" ")
+
+
+def _write_partition(base_dir, date, region, rows) -> dict:
+    """
+    Writes one partition file and returns its manifest entry.
+
+    The file name is derived from its contents, so a rewrite never
+    changes a file that the current manifest points to.
+    """
+    lines = ["|".join(ENRICHED_HEADER)] + ["|".join(_enriched_row(t)) for t in rows]
+    content = "\n".join(lines) + "\n"
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+    rel_dir = f"date={_partition_value(date)}/region={_partition_value(region)}"
+    rel_path = f"{rel_dir}/part-{digest}.txt"
+    path = os.path.join(base_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+    amounts = [t["Quantity"] * t["UnitPrice"] for t in rows]
+    return {
+        "path": rel_path,
+        "date": date,
+        "region": region,
+        "row_count": len(rows),
+        "min_amount_paise": min(amounts),
+        "max_amount_paise": max(amounts),
+        "min_quantity": min(t["Quantity"] for t in rows),
+        "max_quantity": max(t["Quantity"] for t in rows),
+    }
+
+
+def _remove_unlisted_partitions(base_dir, keep_paths):
+    """
+    Deletes partition files (and then empty directories) that are
+    not listed in the current manifest.
+    """
+    keep = set(os.path.normpath(os.path.join(base_dir, p)) for p in keep_paths)
+
+    for date_dir in glob.glob(os.path.join(base_dir, "date=*")):
+        for root, dirs, files in os.walk(date_dir, topdown=False):
+            for name in files:
+                path = os.path.normpath(os.path.join(root, name))
+                if path not in keep:
+                    os.remove(path)
+            if not os.listdir(root):
+                os.rmdir(root)
+
+
+def save_enriched_data_partitioned(enriched_transactions, base_dir="data/enriched_sales", workers=4):
+    """
+    Saves enriched transactions as a Hive-style partitioned dataset:
+
+    data/enriched_sales/
+        _manifest.json
+        date=2024-12-07/region=East/part-<hash>.txt
+        ...
+
+    Partitions are written in parallel. The manifest records the row count
+    and min/max stats of every partition so readers can skip partitions
+    that cannot match their filters (see read_enriched_partitions).
+
+    Safe to run while others read: new partition files are written first,
+    then the manifest is swapped in atomically, and only then are partition
+    files from the previous run removed.
+    """
+    partitions = {}
+    for t in enriched_transactions:
+        key = (_partition_key(t.get("Date")), _partition_key(t.get("Region")))
+        partitions.setdefault(key, []).append(t)
+
+    os.makedirs(base_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_write_partition, base_dir, date, region, rows)
+            for (date, region), rows in sorted(partitions.items())
+        ]
+        entries = [f.result() for f in futures]
+
+    manifest = {
+        "columns": ENRICHED_HEADER,
+        "total_rows": len(enriched_transactions),
+        "partitions": entries,
+    }
+    manifest_path = os.path.join(base_dir, MANIFEST_FILE)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    # Old partitions are removed only after the new manifest is in place
+    _remove_unlisted_partitions(base_dir, [e["path"] for e in entries])
+
+    print(f"✅ Enriched data saved to {len(entries)} partitions in: {base_dir}")
+
+
+def _parse_enriched_line(line: str):
+    """
+    Parses one enriched pipe-file line back into a transaction dictionary.
+    Returns None for malformed lines.
+    """
+    parts = line.split("|")
+    if len(parts) != len(ENRICHED_HEADER):
+        return None
+
+    t = dict(zip(ENRICHED_HEADER, parts))
+    try:
+        t["Quantity"] = int(t["Quantity"])
+        t["UnitPrice"] = to_paise(t["UnitPrice"])
+        t["API_Rating"] = float(t["API_Rating"]) if t["API_Rating"] != "" else None
+    except (ValueError, ArithmeticError):
+        return None
+
+    t["API_Category"] = t["API_Category"] or None
+    t["API_Brand"] = t["API_Brand"] or None
+    t["API_Match"] = t["API_Match"] == "True"
+    return t
+
+
+def _read_partition(path) -> list[dict]:
+    rows = []
+    with open(path, "r", encoding="utf-8") as file:
+        for i, line in enumerate(file):
+            line = line.rstrip("\n")
+            if i == 0 or line.strip() == "":
+                continue
+            t = _parse_enriched_line(line)
+            if t is not None:
+                rows.append(t)
+    return rows
+
+
+def _load_manifest(base_dir):
+    with open(os.path.join(base_dir, MANIFEST_FILE), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def read_enriched_partitions(base_dir="data/enriched_sales", region=None, min_amount=None,
+                             max_amount=None, start_date=None, end_date=None, workers=4):
+    """
+    Reads a partitioned enriched dataset, skipping partitions that
+    cannot match the filters.
+
+    Parameters (all optional, same meaning as in validate_and_filter):
+    - region: only this region
+    - min_amount / max_amount: transaction amount range in rupees
+    - start_date / end_date: date range 'YYYY-MM-DD' (inclusive)
+
+    Partitions are pruned using the manifest (partition keys and min/max
+    amount stats); rows in the remaining partitions are then filtered exactly.
+    If the dataset is rewritten while reading, the new manifest is loaded
+    and the read is retried.
+
+    Returns: list of enriched transactions (UnitPrice in paise)
+    """
+    min_paise = to_paise(min_amount) if min_amount is not None else None
+    max_paise = to_paise(max_amount) if max_amount is not None else None
+
+    for attempt in range(3):
+        try:
+            manifest = _load_manifest(base_dir)
+        except FileNotFoundError:
+            print(f"❌ Error: Manifest not found -> {base_dir}")
+            return []
+
+        selected = []
+        for p in manifest["partitions"]:
+            if region and str(p["region"]).lower() != region.lower():
+                continue
+            if start_date and p["date"] < start_date:
+                continue
+            if end_date and p["date"] > end_date:
+                continue
+            if min_paise is not None and p["max_amount_paise"] < min_paise:
+                continue
+            if max_paise is not None and p["min_amount_paise"] > max_paise:
+                continue
+            selected.append(os.path.join(base_dir, p["path"]))
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                shards = list(executor.map(_read_partition, selected))
+            break
+        except FileNotFoundError:
+            # A newer write replaced the manifest and removed old partitions
+            continue
+    else:
+        print(f"❌ Error: Dataset kept changing while reading -> {base_dir}")
+        return []
+
+    print(f"✅ Reading {len(selected)}/{len(manifest['partitions'])} partitions after pruning")
+
+    rows = []
+    for shard in shards:
+        for t in shard:
+            amount = t["Quantity"] * t["UnitPrice"]
+            if min_paise is not None and amount < min_paise:
+                continue
+            if max_paise is not None and amount > max_paise:
+                continue
+            rows.append(t)
+
+    return rows
+
+
 def enrich_sales_data(transactions, product_mapping):
     """
     Enriches transaction data with API product information.
@@ -0,0 +1,204 @@
+# utils/cache_handler.py
+
+import glob
+import hashlib
+import os
+import pickle
+import tempfile
+
+
+CACHE_DIR = ".cache/results"
+MAX_CACHE_BYTES = 200 * 1024 * 1024  # 200 MB
+
+# Source files whose contents make up the code version,
+# relative to the project root (the folder above utils/)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CODE_FILES = ["main.py", "utils/*.py"]
+
+_code_version = None
+
+
+def file_fingerprint(filename: str) -> str:
+    """
+    Returns the SHA-256 hash of a file's contents (read in chunks).
+    Returns None if the file does not exist.
+    """
+    digest = hashlib.sha256()
+
+    try:
+        with open(filename, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+
+    return digest.hexdigest()
+
+
+def inputs_fingerprint(paths: list[str]) -> str:
+    """
+    Returns one hash for a list of input files: their paths, in order,
+    and the contents of each file.
+    Returns None if the list is empty or any file does not exist,
+    since there is then nothing safe to key cached results on.
+    """
+    if not paths:
+        return None
+
+    digest = hashlib.sha256()
+
+    for path in paths:
+        file_hash = file_fingerprint(path)
+        if file_hash is None:
+            return None
+        digest.update(path.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(file_hash.encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def code_version() -> str:
+    """
+    Returns a hash of the program's source code, so cached results
+    are not reused after the code that produced them changes.
+    """
+    global _code_version
+    if _code_version is not None:
+        return _code_version
+
+    digest = hashlib.sha256()
+    matched = 0
+
+    for pattern in CODE_FILES:
+        for path in sorted(glob.glob(os.path.join(PROJECT_ROOT, pattern))):
+            digest.update(os.path.relpath(path, PROJECT_ROOT).encode("utf-8"))
+            digest.update(file_fingerprint(path).encode("utf-8"))
+            matched += 1
+
+    # Hashing no files would let cached results survive code changes
+    if matched == 0:
+        raise RuntimeError(f"No source files found for code version in: {PROJECT_ROOT}")
+
+    _code_version = digest.hexdigest()
+    return _code_version
+
+
+def make_key(*parts) -> str:
+    """
+    Builds a cache key from the given parts (fingerprints, filters, versions...)
+    plus the current code version.
+
+    Example: make_key("validate", input_hash, {"region": "East", ...})
+    """
+    digest = hashlib.sha256()
+    digest.update(code_version().encode("utf-8"))
+
+    for part in parts:
+        if isinstance(part, dict):
+            part = sorted(part.items())
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+
+    return digest.hexdigest()
+
+
+def _cache_path(key: str, cache_dir: str) -> str:
+    return os.path.join(cache_dir, key + ".pkl")
+
+
+def cache_get(key: str, cache_dir=CACHE_DIR):
+    """
+    Looks up a cached result.
+
+    Returns tuple: (hit, value)
+    A hit also marks the entry as recently used for LRU eviction.
+    A key of None (nothing to key on) is always a miss.
+    """
+    if key is None:
+        return False, None
+
+    path = _cache_path(key, cache_dir)
+
+    try:
+        with open(path, "rb") as file:
+            value = pickle.load(file)
+    except FileNotFoundError:
+        return False, None
+    except (OSError, EOFError, pickle.UnpicklingError):
+        # Corrupt or unreadable entry, treat as a miss
+        return False, None
+
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return True, value
+
+
+def cache_put(key: str, value, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Stores a result in the cache, then evicts least recently used
+    entries until the cache fits in max_bytes.
+    A key of None is not stored.
+    """
+    if key is None:
+        return
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write to a temp file first so readers never see a half-written entry
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _cache_path(key, cache_dir))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Deletes the least recently used cache entries until the
+    total size of the cache is at most max_bytes.
+    """
+    entries = []
+
+    for path in glob.glob(os.path.join(cache_dir, "*.pkl")):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    entries.sort()  # oldest access first
+
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def cached(key: str, compute, cache_dir=CACHE_DIR):
+    """
+    Returns the cached value for key, or calls compute() and caches its result.
+
+    Returns tuple: (value, hit)
+    """
+    hit, value = cache_get(key, cache_dir)
+    if hit:
+        return value, True
+
+    value = compute()
+    cache_put(key, value, cache_dir)
+    return value, False
@@ -1,4 +1,55 @@
+import math
 from datetime import datetime
+from sys import intern
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+# ============================================================
+# MONEY HELPERS
+# ============================================================
+# Money is kept as integer paise (1 rupee = 100 paise) from parsing
+# through aggregation, so sums are exact and do not depend on the
+# order rows are added in. Convert to rupees only for display.
+
+def to_paise(value) -> int:
+    """
+    Converts a rupee amount (string or number) to integer paise,
+    rounding half a paisa away from zero.
+    Example: "1,916.5" -> 191650
+
+    Raises ValueError for text that is not a finite amount (e.g. "abc", "nan", "inf").
+    """
+    text = str(value).replace(",", "").strip()
+
+    # Fast path for plain decimals like "1916.5" or "-12.345": exact integer
+    # arithmetic on the digits, padded or cut to 2 decimals, then rounded
+    unsigned = text[1:] if text[:1] in ("-", "+") else text
+    whole, _, fraction = unsigned.partition(".")
+    digits = whole + fraction
+
+    if digits.isdigit() and digits.isascii():
+        paise = int(digits[:len(whole) + 2] + "00"[len(fraction):])
+        if fraction[2:3] >= "5":
+            paise += 1
+        return -paise if text[0] == "-" else paise
+
+    # Anything else (e.g. "1e3") goes through Decimal
+    try:
+        rupees = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"Not an amount: {value!r}") from None
+
+    if not rupees.is_finite():
+        raise ValueError(f"Not a finite amount: {value!r}")
+
+    return int((rupees * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def paise_to_rupees(paise) -> float:
+    """
+    Converts integer paise back to rupees for display.
+    """
+    return paise / 100
 
 
 # ============================================================
@@ -14,7 +65,7 @@ def parse_transactions(raw_lines: list[str]) -> list[dict]:
     - Remove commas from ProductName
     - Remove commas from numeric fields and convert types
     - Convert Quantity to int
-    - Convert UnitPrice to float
+    - Convert UnitPrice to integer paise
     - Skip rows with incorrect number of fields
     """
 
@@ -39,29 +90,56 @@ def parse_transactions(raw_lines: list[str]) -> list[dict]:
         # Convert to proper types
         try:
             quantity = int(quantity)
-            unit_price = float(unit_price)
+            unit_price = to_paise(unit_price)
         except ValueError:
             # Skip invalid numeric values
             continue
 
+        # Dates, products, customers and regions repeat across rows; interning
+        # makes each distinct value one shared string, which keeps the parsed
+        # table small in memory and in the result cache
         transactions.append({
             "TransactionID": transaction_id.strip(),
-            "Date": date.strip(),
-            "ProductID": product_id.strip(),
-            "ProductName": product_name.strip(),
+            "Date": intern(date.strip()),
+            "ProductID": intern(product_id.strip()),
+            "ProductName": intern(product_name.strip()),
             "Quantity": quantity,
             "UnitPrice": unit_price,
-            "CustomerID": customer_id.strip(),
-            "Region": region.strip()
+            "CustomerID": intern(customer_id.strip()),
+            "Region": intern(region.strip())
         })
 
     return transactions
 
 
+def parse_transaction_shards(shards) -> list[dict]:
+    """
+    Parses shards of raw lines as they arrive (e.g. from read_sales_shards).
+    Each shard is parsed while the following shards are still being read,
+    so file I/O and decompression overlap with parsing.
+    """
+    transactions = []
+
+    for raw_lines in shards:
+        transactions.extend(parse_transactions(raw_lines))
+
+    return transactions
+
+
 # ============================================================
 # PART 1.3: VALIDATION AND FILTERING
 # ============================================================
 
+def _amount_bound(amount):
+    """
+    Converts a min/max filter amount in rupees to paise.
+    inf and nan cannot be paise, so they are kept as floats
+    (comparing an int with a float is still exact).
+    """
+    amount = float(amount)
+    return to_paise(amount) if math.isfinite(amount) else amount * 100
+
+
 def validate_and_filter(transactions: list[dict], region=None, min_amount=None, max_amount=None):
     """
     Validates transactions and applies optional filters.
@@ -69,8 +147,8 @@ def validate_and_filter(transactions: list[dict], region=None, min_amount=None,
     Parameters:
     - transactions: list of transaction dictionaries
     - region: filter by specific region (optional)
-    - min_amount: minimum transaction amount (Quantity * UnitPrice) (optional)
-    - max_amount: maximum transaction amount (optional)
+    - min_amount: minimum transaction amount in rupees (Quantity * UnitPrice) (optional)
+    - max_amount: maximum transaction amount in rupees (optional)
 
     Returns: tuple (valid_transactions, invalid_count, filter_summary)
     """
@@ -92,7 +170,7 @@ def validate_and_filter(transactions: list[dict], region=None, min_amount=None,
             continue
 
     if amounts:
-        print(f"📌 Transaction Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}")
+        print(f"📌 Transaction Amount Range: ₹{paise_to_rupees(min(amounts)):,.0f} - ₹{paise_to_rupees(max(amounts)):,.0f}")
     else:
         print("📌 Transaction Amount Range: Not available")
 
@@ -147,13 +225,15 @@ def validate_and_filter(transactions: list[dict], region=None, min_amount=None,
         print(f"✅ After region filter ({region}): {len(filtered_transactions)} records")
 
     if min_amount is not None:
+        min_paise = _amount_bound(min_amount)
         before = len(filtered_transactions)
-        filtered_transactions = [t for t in filtered_transactions if (t["Quantity"] * t["UnitPrice"]) >= min_amount]
+        filtered_transactions = [t for t in filtered_transactions if (t["Quantity"] * t["UnitPrice"]) >= min_paise]
         filtered_by_amount += before - len(filtered_transactions)
 
     if max_amount is not None:
+        max_paise = _amount_bound(max_amount)
         before = len(filtered_transactions)
-        filtered_transactions = [t for t in filtered_transactions if (t["Quantity"] * t["UnitPrice"]) <= max_amount]
+        filtered_transactions = [t for t in filtered_transactions if (t["Quantity"] * t["UnitPrice"]) <= max_paise]
         filtered_by_amount += before - len(filtered_transactions)
 
     if min_amount is not None or max_amount is not None:
@@ -174,17 +254,17 @@ def validate_and_filter(transactions: list[dict], region=None, min_amount=None,
 # PART 2.1: SALES SUMMARY CALCULATOR
 # ============================================================
 
-def calculate_total_revenue(transactions: list[dict]) -> float:
+def calculate_total_revenue(transactions: list[dict]) -> int:
     """
     Calculates total revenue from all transactions.
-    Returns sum of (Quantity * UnitPrice).
+    Returns sum of (Quantity * UnitPrice) in paise.
     """
     return sum(t["Quantity"] * t["UnitPrice"] for t in transactions)
 
 
 def region_wise_sales(transactions: list[dict]) -> dict:
     """
-    Analyzes sales by region.
+    Analyzes sales by region (total_sales in paise).
 
     Returns dictionary:
     {
@@ -200,7 +280,7 @@ def region_wise_sales(transactions: list[dict]) -> dict:
         amount = t["Quantity"] * t["UnitPrice"]
 
         if reg not in region_data:
-            region_data[reg] = {"total_sales": 0.0, "transaction_count": 0}
+            region_data[reg] = {"total_sales": 0, "transaction_count": 0}
 
         region_data[reg]["total_sales"] += amount
         region_data[reg]["transaction_count"] += 1
@@ -216,11 +296,11 @@ def region_wise_sales(transactions: list[dict]) -> dict:
 
 def top_selling_products(transactions: list[dict], n=5):
     """
-    Finds top n products by total quantity sold.
+    Finds top n products by total quantity sold (revenue in paise).
 
     Returns list of tuples:
     [
-        ('Laptop', 45, 2250000.0),
+        ('Laptop', 45, 225000000),
         ...
     ]
     """
@@ -232,7 +312,7 @@ def top_selling_products(transactions: list[dict], n=5):
         revenue = qty * t["UnitPrice"]
 
         if name not in product_data:
-            product_data[name] = {"qty": 0, "rev": 0.0}
+            product_data[name] = {"qty": 0, "rev": 0}
 
         product_data[name]["qty"] += qty
         product_data[name]["rev"] += revenue
@@ -245,7 +325,7 @@ def top_selling_products(transactions: list[dict], n=5):
 
 def customer_analysis(transactions: list[dict]) -> dict:
     """
-    Analyzes customer purchase patterns.
+    Analyzes customer purchase patterns (money values in paise).
 
     Returns dictionary:
     {
@@ -267,7 +347,7 @@ def customer_analysis(transactions: list[dict]) -> dict:
 
         if cid not in customers:
             customers[cid] = {
-                "total_spent": 0.0,
+                "total_spent": 0,
                 "purchase_count": 0,
                 "products_bought": set()
             }
@@ -292,7 +372,7 @@ def customer_analysis(transactions: list[dict]) -> dict:
 
 def daily_sales_trend(transactions: list[dict]) -> dict:
     """
-    Analyzes sales trends by date.
+    Analyzes sales trends by date (revenue in paise).
 
     Returns dictionary sorted by date:
     {
@@ -308,7 +388,7 @@ def daily_sales_trend(transactions: list[dict]) -> dict:
         cid = t["CustomerID"]
 
         if date not in trend:
-            trend[date] = {"revenue": 0.0, "transaction_count": 0, "customers": set()}
+            trend[date] = {"revenue": 0, "transaction_count": 0, "customers": set()}
 
         trend[date]["revenue"] += amount
         trend[date]["transaction_count"] += 1
@@ -348,11 +428,11 @@ def find_peak_sales_day(transactions: list[dict]):
 
 def low_performing_products(transactions: list[dict], threshold=10):
     """
-    Identifies products with low sales.
+    Identifies products with low sales (revenue in paise).
 
     Returns list of tuples:
     [
-        ('Webcam', 4, 12000.0),
+        ('Webcam', 4, 1200000),
         ...
     ]
     """
@@ -364,7 +444,7 @@ def low_performing_products(transactions: list[dict], threshold=10):
         revenue = qty * t["UnitPrice"]
 
         if name not in product_summary:
-            product_summary[name] = {"qty": 0, "rev": 0.0}
+            product_summary[name] = {"qty": 0, "rev": 0}
 
         product_summary[name]["qty"] += qty
         product_summary[name]["rev"] += revenue
@@ -374,19 +454,51 @@ def low_performing_products(transactions: list[dict], threshold=10):
     return low_perf
 
 
+def compute_aggregates(transactions: list[dict]) -> dict:
+    """
+    Runs every analysis used by the report in one go.
+
+    Returns dictionary:
+    {
+        'total_revenue': ..., 'region_sales': {...}, 'top_products': [...],
+        'customers': {...}, 'daily_trend': {...}, 'peak_day': (...),
+        'low_performing': [...]
+    }
+    """
+    return {
+        "total_revenue": calculate_total_revenue(transactions),
+        "region_sales": region_wise_sales(transactions),
+        "top_products": top_selling_products(transactions, n=5),
+        "customers": customer_analysis(transactions),
+        "daily_trend": daily_sales_trend(transactions),
+        "peak_day": find_peak_sales_day(transactions),
+        "low_performing": low_performing_products(transactions),
+    }
+
+
 # ============================================================
 # PART 4: REPORT GENERATION
 # ============================================================
 
-def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt"):
+def generate_sales_report(transactions, enriched_transactions, output_file="output/sales_report.txt",
+                          aggregates=None):
     """
     Generates a comprehensive formatted text report
     and writes it to output/sales_report.txt
+
+    aggregates: optional result of compute_aggregates(transactions),
+    e.g. from the cache; computed here when not given.
+
+    All money values are aggregated in paise and only
+    converted to rupees here, when they are formatted.
     """
+    if aggregates is None:
+        aggregates = compute_aggregates(transactions)
 
-    total_revenue = calculate_total_revenue(transactions)
+    total_revenue = aggregates["total_revenue"]
     total_transactions = len(transactions)
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
+    rs = paise_to_rupees
 
     # Date range
     dates = [t["Date"] for t in transactions]
@@ -394,23 +506,23 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
     date_end = max(dates) if dates else "N/A"
 
     # Region stats
-    region_stats = region_wise_sales(transactions)
+    region_stats = aggregates["region_sales"]
 
     # Top products
-    top_products = top_selling_products(transactions, n=5)
+    top_products = aggregates["top_products"]
 
     # Top customers
-    customers = customer_analysis(transactions)
+    customers = aggregates["customers"]
     top_customers = list(customers.items())[:5]
 
     # Daily trend
-    trend = daily_sales_trend(transactions)
+    trend = aggregates["daily_trend"]
 
     # Best selling day
-    peak_date, peak_revenue, peak_txns = find_peak_sales_day(transactions)
+    peak_date, peak_revenue, peak_txns = aggregates["peak_day"]
 
     # Low performing products
-    low_perf = low_performing_products(transactions)
+    low_perf = aggregates["low_performing"]
 
     # Enrichment summary
     total_enriched = len(enriched_transactions)
@@ -433,9 +545,9 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         # 2. OVERALL SUMMARY
         f.write("OVERALL SUMMARY\n")
         f.write("-" * 44 + "\n")
-        f.write(f"Total Revenue:        ₹{total_revenue:,.2f}\n")
+        f.write(f"Total Revenue:        ₹{rs(total_revenue):,.2f}\n")
         f.write(f"Total Transactions:   {total_transactions}\n")
-        f.write(f"Average Order Value:  ₹{avg_order_value:,.2f}\n")
+        f.write(f"Average Order Value:  ₹{rs(avg_order_value):,.2f}\n")
         f.write(f"Date Range:           {date_start} to {date_end}\n\n")
 
         # 3. REGION-WISE PERFORMANCE
@@ -443,7 +555,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 44 + "\n")
         f.write(f"{'Region':<10}{'Sales':<16}{'% of Total':<12}{'Transactions':<12}\n")
         for reg, info in region_stats.items():
-            f.write(f"{reg:<10}₹{info['total_sales']:,.0f}       {info['percentage']:>6.2f}%      {info['transaction_count']}\n")
+            f.write(f"{reg:<10}₹{rs(info['total_sales']):,.0f}       {info['percentage']:>6.2f}%      {info['transaction_count']}\n")
         f.write("\n")
 
         # 4. TOP 5 PRODUCTS
@@ -451,7 +563,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 44 + "\n")
         f.write(f"{'Rank':<6}{'Product Name':<20}{'Qty Sold':<10}{'Revenue':<10}\n")
         for i, (name, qty, rev) in enumerate(top_products, start=1):
-            f.write(f"{i:<6}{name:<20}{qty:<10}₹{rev:,.0f}\n")
+            f.write(f"{i:<6}{name:<20}{qty:<10}₹{rs(rev):,.0f}\n")
         f.write("\n")
 
         # 5. TOP 5 CUSTOMERS
@@ -459,7 +571,7 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 44 + "\n")
         f.write(f"{'Rank':<6}{'Customer ID':<12}{'Total Spent':<15}{'Orders':<10}\n")
         for i, (cid, info) in enumerate(top_customers, start=1):
-            f.write(f"{i:<6}{cid:<12}₹{info['total_spent']:,.0f}       {info['purchase_count']}\n")
+            f.write(f"{i:<6}{cid:<12}₹{rs(info['total_spent']):,.0f}       {info['purchase_count']}\n")
         f.write("\n")
 
         # 6. DAILY SALES TREND
@@ -467,26 +579,26 @@ def generate_sales_report(transactions, enriched_transactions, output_file="outp
         f.write("-" * 44 + "\n")
         f.write(f"{'Date':<12}{'Revenue':<16}{'Txns':<8}{'Unique Customers':<15}\n")
         for date, info in trend.items():
-            f.write(f"{date:<12}₹{info['revenue']:,.0f}       {info['transaction_count']:<8}{info['unique_customers']}\n")
+            f.write(f"{date:<12}₹{rs(info['revenue']):,.0f}       {info['transaction_count']:<8}{info['unique_customers']}\n")
         f.write("\n")
 
         # 7. PRODUCT PERFORMANCE ANALYSIS
         f.write("PRODUCT PERFORMANCE ANALYSIS\n")
         f.write("-" * 44 + "\n")
-        f.write(f"Best Selling Day: {peak_date} (₹{peak_revenue:,.0f}, {peak_txns} transactions)\n\n")
+        f.write(f"Best Selling Day: {peak_date} (₹{rs(peak_revenue):,.0f}, {peak_txns} transactions)\n\n")
 
         # Low performing products
         if low_perf:
             f.write("Low Performing Products:\n")
             for name, qty, rev in low_perf:
-                f.write(f"- {name}: {qty} units, ₹{rev:,.0f}\n")
+                f.write(f"- {name}: {qty} units, ₹{rs(rev):,.0f}\n")
         else:
             f.write("Low Performing Products: None\n")
 
         f.write("\nAverage Transaction Value per Region:\n")
         for reg, info in region_stats.items():
             avg_val = info["total_sales"] / info["transaction_count"] if info["transaction_count"] else 0
-            f.write(f"- {reg}: ₹{avg_val:,.0f}\n")
+            f.write(f"- {reg}: ₹{rs(avg_val):,.0f}\n")
 
         f.write("\n")
 
@@ -1,34 +1,119 @@
 # utils/file_handler.py
 
-def read_sales_data(filename: str) -> list[str]:
+import bz2
+import glob
+import gzip
+import io
+import lzma
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ENCODINGS_TO_TRY = ["utf-8", "latin-1", "cp1252"]
+
+# Magic bytes at the start of each supported compressed format
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def detect_compression(filename: str) -> str | None:
     """
-    Reads sales data from a file while handling encoding issues.
-    Returns a list of raw transaction lines (strings).
+    Detects the compression format of a file from its first bytes.
+    Returns 'gzip', 'bz2', 'xz', 'zstd' or None for plain text.
     """
+    with open(filename, "rb") as file:
+        head = file.read(6)
 
-    encodings_to_try = ["utf-8", "latin-1", "cp1252"]
+    for magic, name in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def _open_binary(filename: str):
+    """
+    Opens a (possibly compressed) file as a binary stream of decompressed bytes.
+    Decompression happens on the fly while reading, no temporary files are used.
+    """
+    compression = detect_compression(filename)
+
+    if compression == "gzip":
+        return gzip.open(filename, "rb")
+    if compression == "bz2":
+        return bz2.open(filename, "rb")
+    if compression == "xz":
+        return lzma.open(filename, "rb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstandard package is required to read .zst files")
+        raw = open(filename, "rb")
+        # Concatenated archives and files written by streaming compressors
+        # hold several frames; keep reading past the end of the first one.
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True, read_across_frames=True)
+
+    return open(filename, "rb")
+
+
+def _open_text(filename: str, encoding: str):
+    """
+    Opens a (possibly compressed) file as a text stream.
+    """
+    return io.TextIOWrapper(_open_binary(filename), encoding=encoding)
 
-    for encoding in encodings_to_try:
-        try:
-            with open(filename, "r", encoding=encoding) as file:
-                lines = file.readlines()
 
-            # Remove header and empty lines
+def resolve_input_paths(source) -> list[str]:
+    """
+    Turns the input source into a list of file paths.
+
+    Accepts:
+    - a single path: "data/sales_data.txt"
+    - a glob pattern: "data/shards/sales_*.txt.gz"
+    - a list of paths and/or glob patterns
+    """
+    sources = [source] if isinstance(source, str) else list(source)
+
+    paths = []
+    for s in sources:
+        if glob.has_magic(s):
+            paths.extend(sorted(glob.glob(s)))
+        else:
+            paths.append(s)
+    return paths
+
+
+def read_sales_file(filename: str) -> list[str]:
+    """
+    Reads a single (plain or compressed) sales file while handling encoding issues.
+    Skips the header row and empty lines.
+    Returns a list of raw transaction lines (strings).
+    """
+    for encoding in ENCODINGS_TO_TRY:
+        try:
             cleaned_lines = []
-            for i, line in enumerate(lines):
-                line = line.strip()
+            with _open_text(filename, encoding) as file:
+                for i, line in enumerate(file):
+                    line = line.strip()
 
-                # Skip header row (first line)
-                if i == 0:
-                    continue
+                    # Skip header row (first line of every file)
+                    if i == 0:
+                        continue
 
-                # Skip empty lines
-                if line == "":
-                    continue
+                    # Skip empty lines
+                    if line == "":
+                        continue
 
-                cleaned_lines.append(line)
+                    cleaned_lines.append(line)
 
-            print(f"✅ File read successfully using encoding: {encoding}")
+            print(f"✅ File read successfully using encoding: {encoding} -> {filename}")
             return cleaned_lines
 
         except UnicodeDecodeError:
@@ -39,5 +124,108 @@ def read_sales_data(filename: str) -> list[str]:
             print(f"❌ Error: File not found -> {filename}")
             return []
 
-    print("❌ Error: Could not read file due to encoding issues.")
+        except (OSError, EOFError, ValueError) as e:
+            print(f"❌ Error: Could not decompress file -> {filename} ({e})")
+            return []
+
+    print(f"❌ Error: Could not read file due to encoding issues -> {filename}")
     return []
+
+
+def _read_shards(paths: list[str], workers=1):
+    """
+    Reads the given files one shard at a time, in order.
+
+    With workers > 1, at most `workers` shards are read ahead in background
+    threads, so memory use stays bounded however many shards there are.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield read_sales_file(path)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque()
+        next_path = iter(paths)
+
+        for path in next_path:
+            in_flight.append(executor.submit(read_sales_file, path))
+            if len(in_flight) >= workers:
+                break
+
+        while in_flight:
+            lines = in_flight.popleft().result()
+
+            # Start the next shard before handing this one to the caller
+            path = next(next_path, None)
+            if path is not None:
+                in_flight.append(executor.submit(read_sales_file, path))
+
+            yield lines
+
+
+def read_sales_shards(source, workers=1):
+    """
+    Reads every file in the source one shard at a time.
+
+    With workers > 1, shards are read and decompressed in background threads,
+    so the caller can parse one shard while the next ones are still being read.
+    Shards are yielded in input order as lists of raw lines.
+    """
+    paths = resolve_input_paths(source)
+    if not paths:
+        print(f"❌ Error: No files matched -> {source}")
+        return
+
+    yield from _read_shards(paths, workers)
+
+
+def read_sales_data(source, workers=1) -> list[str]:
+    """
+    Reads sales data from one or more files while handling encoding issues.
+    Accepts a path, a glob pattern or a list of paths; .gz/.bz2/.xz/.zst
+    files are detected automatically and decompressed while streaming.
+    Returns a list of raw transaction lines (strings).
+    """
+    lines = []
+    for shard in read_sales_shards(source, workers=workers):
+        lines.extend(shard)
+    return lines
+
+
+def iter_raw_sales_lines(filename: str):
+    """
+    Streams the transaction lines of one (plain or compressed) file as raw,
+    undecoded bytes, without loading the file into memory.
+    Skips the header row and empty lines.
+
+    The encoding of a file is only known once all of it has been seen, so
+    callers pass every line to fallback_encoding() and decode at the end.
+    """
+    try:
+        with _open_binary(filename) as file:
+            for i, line in enumerate(file):
+                line = line.strip()
+                if i == 0 or line == b"":
+                    continue
+                yield line
+
+    except FileNotFoundError:
+        print(f"❌ Error: File not found -> {filename}")
+
+    except (OSError, EOFError, ValueError) as e:
+        print(f"❌ Error: Could not decompress file -> {filename} ({e})")
+
+
+def fallback_encoding(raw_line: bytes, encoding="utf-8") -> str:
+    """
+    Returns the encoding to decode a file with, given the encoding chosen
+    from its lines so far and one more raw line. Picks the same encoding
+    as read_sales_file: utf-8, unless a line is not valid utf-8, then latin-1.
+    """
+    if encoding == "utf-8" and not raw_line.isascii():
+        try:
+            raw_line.decode("utf-8")
+        except UnicodeDecodeError:
+            return "latin-1"
+    return encoding
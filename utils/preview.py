@@ -0,0 +1,357 @@
+# utils/preview.py
+
+import math
+import random
+from datetime import datetime
+
+from utils.file_handler import resolve_input_paths, iter_raw_sales_lines, fallback_encoding
+from utils.data_processor import parse_transactions, validate_and_filter, paise_to_rupees
+
+
+DEFAULT_SAMPLE_SIZE = 10000
+
+# z-score for a 95% confidence interval
+Z_95 = 1.96
+
+# Fields of a sales line, in file order
+SALES_FIELDS = ["TransactionID", "Date", "ProductID", "ProductName", "Quantity", "UnitPrice", "CustomerID", "Region"]
+
+
+# ============================================================
+# RESERVOIR SAMPLING
+# ============================================================
+
+def reservoir_sample(source, sample_size=DEFAULT_SAMPLE_SIZE, stratify_by=None, seed=None) -> dict:
+    """
+    Draws a uniform random sample of at most sample_size transactions
+    (reservoir sampling) in one pass, without loading the file into memory.
+
+    Parameters:
+    - source: path, glob pattern or list of paths (plain or compressed)
+    - sample_size: total number of rows to keep (must be at least 1)
+    - stratify_by: optional field to stratify on, e.g. 'Region' or 'Date'
+    - seed: optional random seed for repeatable previews
+
+    The reservoir keeps raw lines; only the rows that end up in the sample
+    are decoded and parsed. With stratify_by, the rows of every stratum are
+    counted during the same pass and the sample is split by stratum
+    afterwards (post-stratification), so the total sample size stays fixed
+    however many strata there are. A small stratum can end up with no
+    sampled rows; its sample_size is then 0.
+
+    Returns dictionary of strata:
+    {
+        'East': {'population': 1250, 'sample_size': 120, 'sample': [...transactions...]},
+        ...
+    }
+    sample_size counts every sampled line, including lines that fail parsing.
+    Without stratify_by there is a single stratum named 'ALL'.
+    """
+    if sample_size < 1:
+        raise ValueError("Sample size must be at least 1")
+    if stratify_by and stratify_by not in SALES_FIELDS:
+        raise ValueError(f"Unknown field to stratify by: {stratify_by}")
+
+    field = SALES_FIELDS.index(stratify_by) if stratify_by else None
+    rng = random.Random(seed)
+
+    reservoir = []      # (file number, raw stratum value, raw line)
+    counts = {}         # (file number, raw stratum value) -> rows
+    encodings = []      # encoding of every file, in file order
+    seen = 0
+
+    for file_number, path in enumerate(resolve_input_paths(source)):
+        encoding = "utf-8"
+
+        for line in iter_raw_sales_lines(path):
+            parts = line.split(b"|")
+            # Same rule as parse_transactions: skip rows with the wrong number of fields
+            if len(parts) != len(SALES_FIELDS):
+                continue
+
+            encoding = fallback_encoding(line, encoding)
+            value = parts[field].strip() if field is not None else b""
+            counts[(file_number, value)] = counts.get((file_number, value), 0) + 1
+
+            # Keep the first rows, then replace with decreasing probability (Algorithm R)
+            seen += 1
+            if seen <= sample_size:
+                reservoir.append((file_number, value, line))
+            else:
+                j = rng.randrange(seen)
+                if j < sample_size:
+                    reservoir[j] = (file_number, value, line)
+
+        encodings.append(encoding)
+
+    def stratum_name(file_number, value):
+        return value.decode(encodings[file_number]) if field is not None else "ALL"
+
+    strata = {}
+    lines = {}
+
+    for (file_number, value), count in counts.items():
+        name = stratum_name(file_number, value)
+        if name not in strata:
+            strata[name] = {"population": 0, "sample_size": 0, "sample": []}
+            lines[name] = []
+        strata[name]["population"] += count
+
+    for file_number, value, line in reservoir:
+        name = stratum_name(file_number, value)
+        strata[name]["sample_size"] += 1
+        lines[name].append(line.decode(encodings[file_number]))
+
+    for name, stratum in strata.items():
+        stratum["sample"] = parse_transactions(lines[name])
+
+    return strata
+
+
+def filter_sample(strata: dict, region=None, min_amount=None, max_amount=None) -> dict:
+    """
+    Applies validate_and_filter to the sampled rows of every stratum.
+    Population counts and sample sizes are kept as-is: rows that fail
+    validation or filters simply contribute nothing to the estimated totals.
+    """
+    all_rows = [t for stratum in strata.values() for t in stratum["sample"]]
+    valid_rows, _, _ = validate_and_filter(all_rows, region=region, min_amount=min_amount, max_amount=max_amount)
+    kept = set(id(t) for t in valid_rows)
+
+    filtered = {}
+    for key, stratum in strata.items():
+        filtered[key] = {
+            "population": stratum["population"],
+            "sample_size": stratum["sample_size"],
+            "sample": [t for t in stratum["sample"] if id(t) in kept],
+        }
+    return filtered
+
+
+def unsampled_strata(strata: dict) -> dict:
+    """
+    Returns the strata that have rows but none of them in the sample,
+    as dictionary: stratum -> population. Their totals cannot be estimated.
+    """
+    return {key: s["population"] for key, s in strata.items() if s["sample_size"] == 0}
+
+
+# ============================================================
+# ESTIMATION
+# ============================================================
+
+def estimate_group_totals(strata: dict, group_fn, value_fn) -> dict:
+    """
+    Estimates the population total of value_fn(transaction) for every group
+    (e.g. every region) from a (stratified) simple random sample, with a
+    95% confidence interval. Each sampled row is visited once.
+
+    For a group, rows outside the group and rows that were sampled but
+    filtered out count as value 0.
+
+    Returns dictionary: group -> (estimate, ci_half_width)
+    """
+    estimates = {}
+    variances = {}
+
+    for stratum in strata.values():
+        n = stratum["sample_size"]
+        N = stratum["population"]
+        if n == 0:
+            continue
+
+        groups = {}
+        for t in stratum["sample"]:
+            groups.setdefault(group_fn(t), []).append(value_fn(t))
+
+        for group, values in groups.items():
+            mean = sum(values) / n
+            estimates[group] = estimates.get(group, 0.0) + N * mean
+
+            if n > 1 and n < N:
+                # Two-pass variance; the (n - m) rows outside the group are zeros
+                sum_sq = sum((v - mean) ** 2 for v in values) + (n - len(values)) * mean * mean
+                sample_var = sum_sq / (n - 1)
+                # Finite population correction: exact when the whole stratum is sampled
+                variances[group] = variances.get(group, 0.0) + N * N * (1 - n / N) * sample_var / n
+
+    return {
+        group: (estimate, Z_95 * math.sqrt(variances.get(group, 0.0)))
+        for group, estimate in estimates.items()
+    }
+
+
+def estimate_total(strata: dict, value_fn) -> tuple:
+    """
+    Estimates the population total of value_fn(transaction) over all rows.
+
+    Returns tuple: (estimate, ci_half_width)
+    """
+    return estimate_group_totals(strata, lambda t: None, value_fn).get(None, (0.0, 0.0))
+
+
+def _amount(t):
+    return t["Quantity"] * t["UnitPrice"]
+
+
+def _one(t):
+    return 1
+
+
+def preview_region_sales(strata: dict) -> dict:
+    """
+    Estimated version of region_wise_sales (money in paise).
+
+    Returns dictionary:
+    {
+        'North': {'total_sales': ..., 'total_sales_ci': ..., 'transaction_count': ...,
+                  'transaction_count_ci': ..., 'percentage': ...},
+        ...
+    }
+    """
+    total_revenue, _ = estimate_total(strata, _amount)
+    sales = estimate_group_totals(strata, lambda t: t["Region"], _amount)
+    counts = estimate_group_totals(strata, lambda t: t["Region"], _one)
+
+    region_data = {}
+    for reg, (total, total_ci) in sales.items():
+        count, count_ci = counts[reg]
+        region_data[reg] = {
+            "total_sales": total,
+            "total_sales_ci": total_ci,
+            "transaction_count": count,
+            "transaction_count_ci": count_ci,
+            "percentage": (total / total_revenue * 100) if total_revenue else 0,
+        }
+
+    return dict(sorted(region_data.items(), key=lambda x: x[1]["total_sales"], reverse=True))
+
+
+def preview_top_products(strata: dict, n=5):
+    """
+    Estimated version of top_selling_products (revenue in paise).
+
+    Returns list of tuples:
+    [
+        ('Laptop', est_qty, qty_ci, est_revenue, revenue_ci),
+        ...
+    ]
+    """
+    quantities = estimate_group_totals(strata, lambda t: t["ProductName"], lambda t: t["Quantity"])
+    revenues = estimate_group_totals(strata, lambda t: t["ProductName"], _amount)
+
+    result = [(name, qty, qty_ci) + revenues[name] for name, (qty, qty_ci) in quantities.items()]
+    result.sort(key=lambda x: x[1], reverse=True)
+    return result[:n]
+
+
+def preview_daily_trend(strata: dict) -> dict:
+    """
+    Estimated version of daily_sales_trend (revenue in paise).
+    Unique customers cannot be scaled up from a sample, so the
+    number seen in the sample is reported instead.
+
+    Returns dictionary sorted by date:
+    {
+        '2024-12-01': {'revenue': ..., 'revenue_ci': ..., 'transaction_count': ...,
+                       'transaction_count_ci': ..., 'sample_customers': ...},
+        ...
+    }
+    """
+    revenues = estimate_group_totals(strata, lambda t: t["Date"], _amount)
+    counts = estimate_group_totals(strata, lambda t: t["Date"], _one)
+
+    customers = {}
+    for stratum in strata.values():
+        for t in stratum["sample"]:
+            customers.setdefault(t["Date"], set()).add(t["CustomerID"])
+
+    trend = {}
+    for date, (revenue, revenue_ci) in revenues.items():
+        count, count_ci = counts[date]
+        trend[date] = {
+            "revenue": revenue,
+            "revenue_ci": revenue_ci,
+            "transaction_count": count,
+            "transaction_count_ci": count_ci,
+            "sample_customers": len(customers[date]),
+        }
+
+    return dict(sorted(trend.items()))
+
+
+# ============================================================
+# PREVIEW REPORT
+# ============================================================
+
+def generate_preview_report(strata, stratify_by=None, output_file="output/preview_report.txt"):
+    """
+    Writes a report of estimated figures computed from the sample
+    to output/preview_report.txt. Every figure is an estimate with a
+    95% confidence interval (±).
+    """
+    rs = paise_to_rupees
+
+    population = sum(s["population"] for s in strata.values())
+    sampled = sum(s["sample_size"] for s in strata.values())
+    total_revenue, total_ci = estimate_total(strata, lambda t: t["Quantity"] * t["UnitPrice"])
+
+    region_stats = preview_region_sales(strata)
+    top_products = preview_top_products(strata, n=5)
+    trend = preview_daily_trend(strata)
+
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        # 1. HEADER
+        f.write("=" * 44 + "\n")
+        f.write("      SALES ANALYTICS PREVIEW (ESTIMATES)\n")
+        f.write(f"        Generated: {now}\n")
+        f.write(f"        Sampled: {sampled} of {population} records\n")
+        f.write(f"        Stratified by: {stratify_by or 'None'}\n")
+        f.write("=" * 44 + "\n")
+        f.write("NOTE: All figures below are ESTIMATES scaled up from a\n")
+        f.write("random sample, shown with 95% confidence intervals (±).\n")
+        f.write("Run without --preview for exact figures.\n\n")
+
+        missing = unsampled_strata(strata)
+        if missing:
+            f.write(f"NOTE: {len(missing)} of {len(strata)} strata ({sum(missing.values())} records) have\n")
+            f.write("no rows in the sample and are left out of every estimate:\n")
+            f.write(", ".join(sorted(str(key) for key in missing)) + "\n")
+            f.write("Use a larger --sample-size to include them.\n\n")
+
+        # 2. OVERALL SUMMARY
+        f.write("ESTIMATED SUMMARY\n")
+        f.write("-" * 44 + "\n")
+        f.write(f"Total Revenue:        ₹{rs(total_revenue):,.0f} ± ₹{rs(total_ci):,.0f}\n\n")
+
+        # 3. REGION-WISE PERFORMANCE
+        f.write("REGION-WISE PERFORMANCE (ESTIMATED)\n")
+        f.write("-" * 44 + "\n")
+        f.write(f"{'Region':<10}{'Sales':<28}{'% of Total':<12}{'Transactions':<12}\n")
+        for reg, info in region_stats.items():
+            sales = f"₹{rs(info['total_sales']):,.0f} ± ₹{rs(info['total_sales_ci']):,.0f}"
+            txns = f"{info['transaction_count']:,.0f} ± {info['transaction_count_ci']:,.0f}"
+            f.write(f"{reg:<10}{sales:<28}{info['percentage']:>6.2f}%     {txns}\n")
+        f.write("\n")
+
+        # 4. TOP 5 PRODUCTS
+        f.write("TOP 5 PRODUCTS (ESTIMATED)\n")
+        f.write("-" * 44 + "\n")
+        f.write(f"{'Rank':<6}{'Product Name':<20}{'Qty Sold':<16}{'Revenue':<10}\n")
+        for i, (name, qty, qty_ci, rev, rev_ci) in enumerate(top_products, start=1):
+            qty_text = f"{qty:,.0f} ± {qty_ci:,.0f}"
+            f.write(f"{i:<6}{name:<20}{qty_text:<16}₹{rs(rev):,.0f} ± ₹{rs(rev_ci):,.0f}\n")
+        f.write("\n")
+
+        # 5. DAILY SALES TREND
+        f.write("DAILY SALES TREND (ESTIMATED)\n")
+        f.write("-" * 44 + "\n")
+        f.write(f"{'Date':<12}{'Revenue':<28}{'Txns':<12}{'Customers in Sample':<15}\n")
+        for date, info in trend.items():
+            revenue = f"₹{rs(info['revenue']):,.0f} ± ₹{rs(info['revenue_ci']):,.0f}"
+            txns = f"{info['transaction_count']:,.0f} ± {info['transaction_count_ci']:,.0f}"
+            f.write(f"{date:<12}{revenue:<28}{txns:<12}{info['sample_customers']}\n")
+
+    print(f"✅ Preview report generated (ESTIMATES): {output_file}")
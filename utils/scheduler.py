@@ -0,0 +1,200 @@
+# utils/scheduler.py
+
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# Where each kind of stage runs:
+# - "thread": thread pool. Meant for stages that wait on the network or disk,
+#             so that they overlap with the rest of the pipeline.
+# - "inline": the calling thread, with the console to itself
+#             (e.g. stages that need input()).
+# Pure computation gains nothing from more threads, so a pipeline should
+# keep it on one path of the DAG and overlap it only with waiting stages.
+STAGE_KINDS = ("thread", "inline")
+
+
+def _stage_needs(stage: dict) -> list[str]:
+    # Stages that must finish first: deps (results passed in) + after (order only)
+    return stage.get("deps", []) + stage.get("after", [])
+
+
+def _check_stages(stages: dict) -> list[str]:
+    """
+    Validates stage definitions and returns the stage names in dependency order.
+    Raises ValueError for unknown kinds, missing dependencies or cycles.
+    """
+    for name, stage in stages.items():
+        if stage.get("kind", "thread") not in STAGE_KINDS:
+            raise ValueError(f"Stage '{name}' has unknown kind: {stage.get('kind')}")
+        for dep in _stage_needs(stage):
+            if dep not in stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+
+    order = []
+    done = set()
+    remaining = dict(stages)
+
+    while remaining:
+        ready = [n for n, s in remaining.items() if all(d in done for d in _stage_needs(s))]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {', '.join(remaining)}")
+        for name in ready:
+            order.append(name)
+            done.add(name)
+            del remaining[name]
+
+    return order
+
+
+class _Console:
+    """
+    Stand-in for sys.stdout while stages run.
+
+    - Output is written a whole line at a time, so lines printed by
+      different threads never run into each other.
+    - While held, only the owning thread's output is written; lines from
+      other threads are kept back and written on release().
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+        self.partial = {}  # thread id -> text not ending in a newline yet
+        self.owner = None
+        self.held = []
+
+    def _emit(self, text):
+        # Caller holds self.lock
+        if self.owner is not None and threading.get_ident() != self.owner:
+            self.held.append(text)
+        else:
+            self.stream.write(text)
+
+    def write(self, text):
+        thread = threading.get_ident()
+        with self.lock:
+            # print() writes the text and the newline separately;
+            # keep the text back until its line is complete
+            pending = self.partial.pop(thread, "") + text
+            if pending.endswith("\n"):
+                self._emit(pending)
+            elif pending:
+                self.partial[thread] = pending
+        return len(text)
+
+    def flush(self):
+        # Unfinished lines are written on flush, e.g. input() prompts
+        with self.lock:
+            rest = self.partial.pop(threading.get_ident(), "")
+            if rest:
+                self._emit(rest)
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def hold(self):
+        with self.lock:
+            self.owner = threading.get_ident()
+
+    def release(self):
+        with self.lock:
+            self.owner = None
+            self.stream.write("".join(self.held))
+            self.held = []
+        self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            self.stream.write("".join(self.partial.values()))
+            self.partial = {}
+        self.release()
+
+
+def _run_inline(console, func, args):
+    """
+    Runs an inline stage (e.g. one that calls input()) with the console
+    to itself: output from background stages is shown after it returns.
+    """
+    console.hold()
+    try:
+        return func(*args)
+    finally:
+        console.release()
+
+
+def run_stages(stages: dict, workers=4) -> dict:
+    """
+    Runs a DAG of pipeline stages, starting each stage as soon as
+    all of its dependencies have finished.
+
+    stages format:
+    {
+        'read':   {'func': read_fn, 'deps': [], 'kind': 'thread'},
+        'prompt': {'func': prompt_fn, 'deps': [], 'after': ['read'], 'kind': 'inline'},
+        'parse':  {'func': parse_fn, 'deps': ['read', 'prompt']},
+        ...
+    }
+
+    Each func is called with the results of its deps, in the order listed.
+    Stages listed in 'after' only have to finish first; their results are
+    not passed in. Independent stages run at the same time, so total time
+    is the critical path instead of the sum of all stages.
+
+    Printed output is written whole lines at a time. While an inline stage
+    runs, lines printed by other stages are held back until it returns,
+    so they do not break into prompts.
+
+    Returns: dictionary of stage name -> result
+    Raises the first exception raised by any stage.
+    """
+    order = _check_stages(stages)
+
+    results = {}
+    running = {}
+    pending = list(order)
+
+    console = _Console(sys.stdout)
+    sys.stdout = console
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while pending or running:
+                    ready = [n for n in pending if all(d in results for d in _stage_needs(stages[n]))]
+
+                    # Start every ready thread stage before running an inline one
+                    inline = []
+                    for name in ready:
+                        stage = stages[name]
+                        args = [results[d] for d in stage.get("deps", [])]
+                        pending.remove(name)
+
+                        if stage.get("kind", "thread") == "inline":
+                            inline.append((name, stage["func"], args))
+                        else:
+                            running[pool.submit(stage["func"], *args)] = name
+
+                    if inline:
+                        # Run one; the rest go back so new thread stages it unlocks start first
+                        name, func, args = inline[0]
+                        pending[:0] = [n for n, _, _ in inline[1:]]
+                        results[name] = _run_inline(console, func, args)
+                        continue
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name = running.pop(future)
+                        results[name] = future.result()
+
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+    finally:
+        sys.stdout = console.stream
+        console.close()
+
+    return results